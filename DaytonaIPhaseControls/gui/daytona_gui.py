@@ -1,16 +1,29 @@
 import os
 import csv
+import time
 import json
+from functools import partial
 from urllib import response
 from PyQt5 import QtWidgets, uic
 from PyQt5.QtWidgets import QMainWindow, QMessageBox, QApplication, QTableWidgetItem, QFileDialog, QWidget
 from PyQt5.QtCore import QTimer
+import numpy as np
 import pyqtgraph as pg
 from gui.tt_popup import ttPopup
-from ics_client.client import ICS_Client
+from gui.ring_buffer import SeriesRingBuffer
+from gui.table_models import ChannelTableModel, ChannelFilterProxyModel
+from recorder.readback_recorder import ReadbackRecorder, export_csv
+from recorder.history import HistoryView
+from ics_client.client import ICS_Client, ICSRequestError
+from ics_client.readback_cache import ReadbackCache, DEFAULT_MAX_AGE_S
+from ics_client.setpoint_tracker import SetpointTracker
+from ics_client.setpoint_validator import SetpointValidator
 from workers.request_worker import RequestWorker
-from tt_engine.tt_builder import Daytona_HDC_tt, Daytona_SinglePath_tt
-from scripts.fpga_map import SC, TW
+from workers.request_executor import RequestExecutor
+from workers.acquisition_worker import AcquisitionWorker, SampleQueue, MIN_INTERVAL_S
+from tt_engine.tt_incremental import IncrementalTT
+from tt_engine.tt_compiler import unresolved_message
+from tt_engine.twave_ramp import expand_profile
 from ledeez.ledeez import LedStrip
 
 class DaytonaGUI(QtWidgets.QMainWindow):
@@ -38,16 +51,25 @@ class DaytonaGUI(QtWidgets.QMainWindow):
 
         self.twr_tables = [self.pathA_tbl, self.pathB_tbl]
 
+        #Method and plotter channel tables, the last column holds the readbacks
+        self.parameter_model = ChannelTableModel(self.paramter_tbl_headers)
+        self.parameter_proxy = ChannelFilterProxyModel()  # Filtered view of the method table
+        self.parameter_proxy.setSourceModel(self.parameter_model)
+        self.parameter_table.setModel(self.parameter_proxy)
+        self.params_model = ChannelTableModel(self.readback_tbl_headers)
+        self.params_table.setModel(self.params_model)
+
         self.updateGUI_with_intent(os.path.join(os.path.dirname(__file__), "config", "default_daytona_intent.json"))
 
         #Wire up buttons to functions
         self.connect_btn.clicked.connect(self.connect_to_ICS)
-        self.getreadbacks_btn.clicked.connect(lambda: self.get_readbacks(self.get_ics_channels(self.parameter_table), table_widget=self.parameter_table))
+        self.getreadbacks_btn.clicked.connect(lambda: self.get_readbacks(self.get_ics_channels(self.parameter_model), table_model=self.parameter_model))
         self.method_combo_box.currentTextChanged.connect(self.on_method_dropdown_change)
         self.intent_combo_box.currentTextChanged.connect(self.on_intent_dropdown_change)
-        self.putsetpoints_btn.clicked.connect(lambda: self.post_setpoints(self.get_ics_channels(self.parameter_table)))
-        self.upload_method_btn.clicked.connect(lambda: self.load_csv_file(self.parameter_table, self.paramter_tbl_headers[:-1]))
-        self.upload_readbacks_btn.clicked.connect(lambda: self.load_csv_file(self.params_table, self.readback_tbl_headers[:-1]))
+        self.putsetpoints_btn.clicked.connect(lambda: self.post_setpoints(self.get_ics_channels(self.parameter_model),
+                                                                          self.get_canonical_names(self.parameter_model)))
+        self.upload_method_btn.clicked.connect(lambda: self.load_csv_file(self.parameter_model, self.paramter_tbl_headers[:-1]))
+        self.upload_readbacks_btn.clicked.connect(lambda: self.load_csv_file(self.params_model, self.readback_tbl_headers[:-1]))
         self.generateTT_btn.clicked.connect(self.generate_tt)
         self.addRow_TWRA_btn.clicked.connect(lambda: self.add_remove_row(self.pathA_tbl, add = True))
         self.addRow_TWRB_btn.clicked.connect(lambda: self.add_remove_row(self.pathB_tbl, add = True))
@@ -64,8 +86,26 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         self.stop_plot_btn.clicked.connect(self.stop_plotting)
         self.export_data_btn.clicked.connect(self.export_plot_data)
         self.clear_plot_btn.clicked.connect(self.clear_plot)
-
-        self.input_filter_text.textChanged.connect(self.filter_parameter_table)
+        self.open_recording_btn.clicked.connect(self.open_recording)
+
+        #Live timing table preview while the popup is open
+        self.tt_compiler = IncrementalTT(optimize=True)
+        self.popup = None
+        self.intent_inputs = [self.input_sip_period, self.input_stall_time, self.input_fill_time, self.input_release_time,
+                              self.input_trap_time, self.input_flush_voltage, self.input_flush_time,
+                              self.input_fill_params_amp, self.input_fill_params_freq, self.input_trap_params_amp,
+                              self.input_trap_params_freq, self.input_release_params_amp, self.input_release_params_freq]
+        for line_edit in self.intent_inputs:
+            line_edit.textChanged.connect(self.preview_tt)
+        self.pathComboBox.currentIndexChanged.connect(self.preview_tt)
+        self.pathA_tbl.itemChanged.connect(self.preview_tt)
+        self.pathB_tbl.itemChanged.connect(self.preview_tt)
+
+        self.filter_timer = QTimer()  # Filter once typing pauses, not on every keystroke
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(150)
+        self.filter_timer.timeout.connect(self.filter_parameter_table)
+        self.input_filter_text.textChanged.connect(self.filter_timer.start)
         self.column_combo_box.currentIndexChanged.connect(self.filter_parameter_table)
         self.applyFilterBox.toggled.connect(
             lambda checked: self.input_filter_text.clear() if not checked else None
@@ -75,16 +115,26 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         
         self.pathA_tbl.setHorizontalHeaderLabels(self.twr_headers)
         self.pathB_tbl.setHorizontalHeaderLabels(self.twr_headers)
-        self.params_table.setHorizontalHeaderLabels(self.readback_tbl_headers)
 
         self.plotting_widget.setBackground('w')
         self.plotting_widget.clear()
         self.plotting_widget.addLegend()
+        self.plotting_widget.setDownsampling(auto=True, mode='peak')  # Render about one point per pixel column
+        self.plotting_widget.setClipToView(True)
         self.curve = self.plotting_widget.plot(pen=pg.mkPen(color='b', width=2))
-        self.readback_data_series = [] 
         self.max_points = 500000 
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_readbacks)
+        self.readback_buffer = SeriesRingBuffer(self.max_points, 0)
+        self.plot_fps = 30
+        self.acquisition_worker = None
+        self.acquisition_queue = None
+        self.recorder = None
+        self.recordings_dir = os.path.join(os.path.dirname(__file__), "recordings")
+        self.history = None  # Recorded run shown in viewer mode
+        self.plotting_widget.getViewBox().sigXRangeChanged.connect(self.refresh_history)
+        self.timer = QTimer()  # Plot refresh, the readbacks are polled by the acquisition worker
+        self.timer.timeout.connect(self.refresh_plot)
+        self.request_executor = RequestExecutor(max_workers=4)  # Shared pool for readback and setpoint requests
+        self.setpoint_validator = SetpointValidator()  # Checks setpoints against the parameters JSON before posting
 
         self.status_label.setText("Disconnected")
         self.status_label.setStyleSheet("color: red; font-weight: bold;")
@@ -115,27 +165,67 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         self.lmodeStateLED_btn.clicked.connect(lambda: self.led_strip.set_LED_state(input_state='cylon'))
         self.LEDcount_btn.clicked.connect(lambda: self.led_strip.set_LED_state(input_state='update', value=self.numLEDs_input.text()))
 
+    def closeEvent(self, event):
+        self.stop_acquisition()
+        self.request_executor.shutdown()
+        super().closeEvent(event)
+
     def add_plotter_tbl_row(self):
-        row_position = self.params_table.rowCount()
-        self.params_table.insertRow(row_position)
+        row_position = self.params_model.rowCount()
+        self.params_model.insertRows(row_position, 1)
 
     def rmv_plotter_tbl_row(self):
-        current_row = self.params_table.currentRow()
+        current_row = self.params_table.currentIndex().row()
         if current_row >= 0:
-            self.params_table.removeRow(current_row)
+            self.params_model.removeRows(current_row, 1)
 
     def start_polling(self):
+        '''
+        Start polling the params_table channels on the acquisition thread every interval seconds (down to 10 ms).
+        The plot is refreshed from the samples it queues at plot_fps, independent of the polling rate.
+        '''
         interval_str = self.interval_input.text().strip()
         try:
-            interval = int(interval_str)
-            if interval <= 0:
+            interval = float(interval_str)
+            if interval < MIN_INTERVAL_S:
                 raise ValueError
         except ValueError:
-            self.show_error_popup("Invalid interval. Enter a positive number.")
+            self.show_error_popup(f"Invalid interval. Enter a number of seconds, at least {MIN_INTERVAL_S}.")
+            return
+
+        if not hasattr(self, 'ics_client'):
+            self.show_error_popup("Not connected to ICS.")
             return
 
-        self.update_readbacks() 
-        self.timer.start(interval * 1000) 
+        self.stop_acquisition()
+        self.history = None
+        self.plotting_widget.enableAutoRange()
+        self.setup_plot_curves()
+
+        channels = self.params_model.channel_names()
+        labels = [curve.name() for curve in self.curves]
+        self.recorder = ReadbackRecorder(self.recordings_dir, [channel or '' for channel in channels], labels)
+        print(f"Recording readbacks to {self.recorder.run_dir}")
+
+        self.acquisition_queue = SampleQueue()
+        # Served from the shared cache, but never older than half an interval so every sample is a new read
+        read_channels = partial(self.readback_cache.read_channels, max_age_s=min(DEFAULT_MAX_AGE_S, interval / 2))
+        self.acquisition_worker = AcquisitionWorker(read_channels, channels, interval, self.acquisition_queue, self.recorder)
+        self.acquisition_worker.error.connect(lambda error: print(f"Error retrieving readbacks: {error}"))
+        self.acquisition_start = time.monotonic()
+        self.acquisition_worker.start()
+
+        self.timer.start(int(1000 / self.plot_fps))
+        self.status_label.setText("Plotting")
+        self.status_label.setStyleSheet("color: green; font-weight: bold;")
+
+    def stop_acquisition(self):
+        if self.acquisition_worker is not None:
+            self.acquisition_worker.stop()
+            self.acquisition_worker.wait()
+            self.acquisition_worker = None
+        if self.recorder is not None:
+            self.recorder.close()  # Kept for export_plot_data
 
     def show_error_popup(self, error_code):
         msg = QMessageBox()
@@ -144,41 +234,112 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         msg.setText(f"Failed to get token.\nError code: {error_code}")
         msg.exec_()
 
-    def update_readbacks(self):
-
-        self.get_readbacks(self.get_ics_channels(self.params_table), self.params_table)
+    def show_validation_popup(self, errors):
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Warning)
+        msg.setWindowTitle("Invalid Setpoints")
+        lines = "\n".join(f"{name}: {error}" for name, error in errors.items())
+        msg.setText(f"Setpoints not posted, {len(errors)} invalid:\n{lines}")
+        msg.exec_()
 
+    def setup_plot_curves(self):
+        '''
+        One curve per params_table row, the series restart from empty.
+        '''
         table_data = self.get_table_data()
 
-        if len(self.readback_data_series) != len(table_data):
-            self.plotting_widget.clear()
-            self.plotting_widget.addLegend()
-            self.readback_data_series = [[] for _ in table_data]
-            self.curves = []
-            for i, row in enumerate(table_data):
-                param_name = row[0]
-                color = pg.intColor(i)
-                pen = pg.mkPen(color=color, width=2)
-                curve = self.plotting_widget.plot(pen=pen, name=param_name)
-                self.curves.append(curve)
-
-    def update_plot(self, list_of_readbacks):
-        for i, readback in enumerate(list_of_readbacks):
-            series = self.readback_data_series[i]
-            series.append(float(readback))
-            if len(series) > self.max_points:
-                series.pop(0)
-            self.curves[i].setData(series)
+        self.plotting_widget.clear()
+        self.plotting_widget.addLegend()
+        self.readback_buffer = SeriesRingBuffer(self.max_points, len(table_data))
+        self.curves = []
+        for i, row in enumerate(table_data):
+            param_name = row[0]
+            color = pg.intColor(i)
+            pen = pg.mkPen(color=color, width=2)
+            curve = self.plotting_widget.plot(pen=pen, name=param_name, connect='finite')  # NaN marks a failed read
+            self.curves.append(curve)
+
+    def refresh_plot(self):
+        '''
+        Plot frame: move the samples queued by the acquisition thread into the series and show the latest readbacks.
+        '''
+        if self.acquisition_queue is None:
+            return
+
+        timestamps, samples = self.acquisition_queue.drain()
+        if not len(timestamps):
+            return
+
+        self.update_plot(timestamps - self.acquisition_start, samples)
+
+        self.params_model.set_readbacks(samples[-1].tolist())  # NaN (failed read) keeps the previous readback
+
+    def update_plot(self, timestamps, samples):
+        '''
+        Append samples[sample, channel] taken at timestamps (seconds since the start of acquisition) to the series.
+        The curves are given views into the ring buffer, nothing is copied.
+        '''
+        self.readback_buffer.extend(timestamps, samples)
+        times = self.readback_buffer.times()
+
+        for i, curve in enumerate(self.curves):
+            curve.setData(times, self.readback_buffer.channel(i))
 
     def stop_plotting(self):
+        self.stop_acquisition()
         self.timer.stop()
+        self.refresh_plot()  # Samples queued since the last frame
         self.status_label.setText("Plotting Stopped")
         self.status_label.setStyleSheet("color: black; font-weight: bold;")
 
     def clear_plot(self):
         self.plotting_widget.clear()
         self.curves = []
-        self.readback_data_series = []
+        self.readback_buffer.clear()
+        self.history = None
+
+    def open_recording(self):
+        '''
+        Viewer mode: browse a recorded run. The run stays on disk (memory mapped); each zoom or pan loads only the
+        min/max pyramid level that matches the visible span and the plot width.
+        '''
+        run_dir = QFileDialog.getExistingDirectory(self, "Open Recorded Run", self.recordings_dir)
+
+        if not run_dir:
+            return
+
+        try:
+            history = HistoryView(run_dir)
+        except (OSError, ValueError) as e:
+            print(f"Failed to open recording {run_dir}: {e}")
+            return
+
+        self.stop_plotting()
+        self.plotting_widget.clear()
+        self.plotting_widget.addLegend()
+        self.curves = []
+        for i, label in enumerate(history.labels):
+            pen = pg.mkPen(color=pg.intColor(i), width=2)
+            self.curves.append(self.plotting_widget.plot(pen=pen, name=label, connect='finite'))
+
+        self.history = history
+        self.plotting_widget.disableAutoRange()  # The visible range drives which data is loaded
+        self.plotting_widget.setXRange(*history.time_range(), padding=0)
+        self.refresh_history()
+        self.plotting_widget.enableAutoRange(axis='y')
+        self.status_label.setText(f"Viewing {os.path.basename(run_dir)}")
+        self.status_label.setStyleSheet("color: black; font-weight: bold;")
+
+    def refresh_history(self, *args):
+        if self.history is None:
+            return
+
+        t0, t1 = self.plotting_widget.viewRange()[0]
+        max_points = max(2 * self.plotting_widget.width(), 1000)
+        level, times, values = self.history.window(t0, t1, max_points)
+
+        for curve, series in zip(self.curves, values):
+            curve.setData(times, series)
 
     def export_plot_data(self):
         file_path, _ = QFileDialog.getSaveFileName(self, "Save Data as CSV", "", "CSV Files (*.csv);;All Files (*)")
@@ -189,18 +350,25 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         if not file_path.endswith('.csv'):
             file_path += '.csv'
 
+        if self.recorder is not None:  # Full history of the last run, streamed from disk
+            try:
+                self.recorder.flush()
+                rows = export_csv(self.recorder.run_dir, file_path)
+                print(f"Exported {rows} recorded samples to {file_path}")
+            except Exception as e:
+                print(f"Failed to write {file_path}: {e}")
+            return
+
         try:
             with open(file_path, mode='w', newline='') as file:
                 writer = csv.writer(file)
-                header = ['Index'] + [self.curves[i].name() for i in range(len(self.readback_data_series))]
+                header = ['Index', 'Time (s)'] + [curve.name() for curve in self.curves]
                 writer.writerow(header)
 
-                max_length = max(len(series) for series in self.readback_data_series)
-                for i in range(max_length):
-                    row = [i]
-                    for series in self.readback_data_series:
-                        row.append(series[i] if i < len(series) else '')
-                    writer.writerow(row)
+                buffer = self.readback_buffer
+                columns = [buffer.times()] + [buffer.channel(i) for i in range(len(self.curves))]
+                for i, row in enumerate(np.column_stack(columns).tolist()):
+                    writer.writerow([i] + row)
 
             print(f"Data exported successfully to {file_path}")
 
@@ -208,18 +376,7 @@ class DaytonaGUI(QtWidgets.QMainWindow):
             print(f"Failed to write {file_path}: {e}")
 
     def get_table_data(self):
-        table_data = []
-        row_count = self.params_table.rowCount()
-        col_count = self.params_table.columnCount()
-
-        for row in range(row_count):
-            row_data = []
-            for col in range(col_count - 1): 
-                item = self.params_table.item(row, col)
-                row_data.append(item.text() if item else "")
-            table_data.append(row_data)
-
-        return table_data
+        return self.params_model.table_rows()
 
     def connect_to_ICS(self):
         '''
@@ -232,16 +389,18 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         #Get the version of the electronics to confirm connection
         try:
             self.ics_client = ICS_Client(base_url=self.hostAddress)
+            self.readback_cache = ReadbackCache(self.ics_client)  # Shared by the method table, the plotter and its table
+            self.setpoint_tracker = SetpointTracker(self.ics_client)  # Nothing acknowledged yet, the first post sends everything
             response = self.ics_client.send_request('/api/ics/instrument/initialization/', 
                                                     method='GET',
                                                     port=8001)
-            if response:
+            if response and not isinstance(response, ICSRequestError):
                 print("Connected to ICS successfully!")
                 print(f"ICS Status: {response}")
                 self.status_label.setText("Connected")
                 self.status_label.setStyleSheet("color: green; font-weight: bold;")
             else:
-                print("Failed to connect to ICS.")
+                print(f"Failed to connect to ICS: {response}")
         except Exception as e:
             print(f"Error connecting to ICS: {e}")
 
@@ -296,114 +455,106 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         Clears existing entries and populates the table with new parameter data.
         Adds an extra "Readback" column at the end.
         '''
-        self.parameter_table.setRowCount(0)  # Clear existing rows
-
         with open(csv_file_path, newline='') as csvfile:
             reader = csv.reader(csvfile)
             headers = next(reader)  # First row = column headers
 
-            # Step 1: Add extra header for readbacks
-            headers.append("Readback")
-
-            # Step 2: Set column count and headers
-            self.parameter_table.setColumnCount(len(headers))
-            self.parameter_table.setHorizontalHeaderLabels(headers)
-
-            # Step 3: Populate the table
-            for row_data in reader:
-                row_position = self.parameter_table.rowCount()
-                self.parameter_table.insertRow(row_position)
+            # One model reset for the whole method, the extra Readback column starts empty
+            self.parameter_model.load(list(reader), headers + ["Readback"])
 
-                for column, cell_value in enumerate(row_data):
-                    item = QtWidgets.QTableWidgetItem(cell_value)
-                    self.parameter_table.setItem(row_position, column, item)
-
-                # Step 4: Add empty QTableWidgetItem for the Readback column
-                readback_column_index = len(headers) - 1
-                self.parameter_table.setItem(
-                    row_position,
-                    readback_column_index,
-                    QtWidgets.QTableWidgetItem("")  # Empty initially
-                )
-
-    def get_ics_channels(self, table_widget):
+    def get_ics_channels(self, table_model):
         '''
-        Extract canonical names from the parameter table and return them as a list.
-        Iterates through the rows of the table and collects the canonical names from the board_id, parameter, and setpoint columns.
+        Extract canonical names from a channel table and return them as a list.
+        Collects the canonical names from the board_id and parameter columns, paired with the setpoint column.
         '''
         channel_result = []
 
-        for row in range(table_widget.rowCount()):
-            board_id_item = table_widget.item(row, 1)  # Second column = board_id
-            parameter_item = table_widget.item(row, 2)  # Third column = parameter
-            setpoint_item = table_widget.item(row, 3)  # Fourth column = setpoint value
+        for row, channel_name in enumerate(table_model.channel_names()):
+            if channel_name:  # Need both board_id and parameter to form canonical name
+                setpoint_text = table_model.text(row, 3)  # Fourth column = setpoint value
+                channel_result.append((channel_name, setpoint_text))
 
-            if board_id_item and parameter_item:  # Need both to form canonical name
-                board_id_text = board_id_item.text() if board_id_item.text() else ''
-                parameter_text = parameter_item.text() if parameter_item.text() else ''
-                setpoint_text = setpoint_item.text() if setpoint_item else ''  # Safely handle None
+        return channel_result
 
-                channel_array = (f"@{board_id_text}.{parameter_text}", setpoint_text)
-                channel_result.append(channel_array)
+    def get_canonical_names(self, table_model):
+        '''
+        Canonical Name column of the rows get_ics_channels returns, in the same order.
+        '''
+        return [table_model.text(row, 0) or None
+                for row, channel_name in enumerate(table_model.channel_names()) if channel_name]
 
-        return channel_result
-        
-    def handle_readback_response(self, response, table_widget=None):
+    def handle_readback_response(self, response, table_model=None):
 
         if isinstance(response, Exception):
             print(f"Error retrieving readbacks: {response}")
             return None
 
-        values = [item["value"] for item in response]
+        if response.errors:
+            print(f"Readbacks failed for {len(response.errors)} channels: {response.errors}")
 
-        if table_widget.rowCount() < len(values):
-            table_widget.setRowCount(len(values))
+        slowest = response.slowest_chunk()
+        if slowest is not None and len(response.chunks) > 1:
+            print(f"Read {len(response.values)} channels in {len(response.chunks)} chunks, {response.seconds:.3f} s "
+                  f"(slowest chunk {slowest.seconds:.3f} s, {len(slowest.names)} channels)")
 
-        for row, value in enumerate(values):
-            table_widget.setItem(row, 4 if table_widget == self.parameter_table else 3, QTableWidgetItem(str(value)))
+        table_model.set_readbacks(response.values)  # Matched to rows by channel name
 
-        if table_widget == self.params_table:
-            self.update_plot(values)
-    
         return response
 
-    def get_readbacks(self, data, table_widget):
+    def get_readbacks(self, data, table_model):
 
         readback_list = []
         for paramter, setpoint in data:
             readback_list.append(paramter)
 
-        # Keep the worker alive
-        self.worker = RequestWorker(
-            self.ics_client.send_request,
-            'api/ics/channels/',
+        # A newer poll of the same table supersedes this one, identical polls in flight are shared
+        self.request_executor.submit(
+            self.readback_cache.read_channels,
+            readback_list,
             8001,
-            method='GET',
-            data=";".join(readback_list)
+            callback=lambda response: self.handle_readback_response(response, table_model),
+            channel=('readbacks', id(table_model))
         )
-
-        self.worker.finished.connect(lambda response: self.handle_readback_response(response, table_widget))
-        self.worker.finished.connect(self.worker.deleteLater)  # safely delete after done
-        self.worker.start()
     
-    def post_setpoints(self, data):
+    def post_setpoints(self, data, canonical_names=None):
+        '''
+        Post the setpoints that changed since they were last acknowledged by the ICS, optionally verifying them.
+        The whole method is validated and quantized first, by canonical name where given; nothing is posted if any
+        setpoint is invalid.
+        '''
+        self.setpoint_validator.refresh()
+        validation = self.setpoint_validator.validate(data, canonical_names)
 
-        payload = [{"canonical_name": canonical,"value": value} for canonical, value in data]
-        
-        # Keep the worker alive
-        self.worker = RequestWorker(
-            self.ics_client.send_request,
-            'api/ics/channels/',
-            8001,
-            method='POST',
-            data=payload
+        if not validation.ok:
+            self.show_validation_popup(validation.errors)
+            return
+
+        for name, warning in validation.warnings.items():
+            print(f"Setpoint {name} sent unchanged: {warning}")
+
+        for name, candidates in validation.ambiguous.items():
+            print(f"Setpoint {name} not validated, it matches {len(candidates)} parameters: {', '.join(candidates)}")
+
+        for name, (given, value) in validation.adjusted.items():
+            print(f"Setpoint {name}: {given!r} sent as {value}")
+
+        self.request_executor.submit(
+            self.setpoint_tracker.push,
+            validation.setpoints,
+            verify=self.verify_setpoints_box.isChecked(),
+            callback=self.handle_setpoint_response,
+            channel='setpoints'
         )
 
-        self.worker.finished.connect(lambda response: print(f"Setpoint post response: {response}"))
-        self.worker.finished.connect(self.worker.deleteLater)  # safely delete after done
-        self.worker.start()
+    def handle_setpoint_response(self, result):
+        if isinstance(result, Exception):
+            print(f"Error posting setpoints: {result}")
+            return
+
+        self.readback_cache.invalidate(result.sent)  # Readbacks read before the write are stale
+        print(result.report())
 
-    def load_csv_file(self, table, expected_columns):
+    def load_csv_file(self, table_model, expected_columns):
         
         
         options = QFileDialog.Options()
@@ -428,16 +579,8 @@ class DaytonaGUI(QtWidgets.QMainWindow):
                     print(f"CSV must contain columns: {expected_columns}")
                     return
 
-                table.setRowCount(0)  # Clear existing data
-
-                for row_data in reader:
-                    row_index = table.rowCount()
-                    table.insertRow(row_index)
-
-                    for col_index, col_name in enumerate(expected_columns):
-                        value = row_data.get(col_name, "")
-                        item = QTableWidgetItem(value)
-                        table.setItem(row_index, col_index, item)
+                rows = [[row_data.get(col_name, "") for col_name in expected_columns] for row_data in reader]
+                table_model.load(rows)  # Replaces the existing data
 
         except Exception as e:
             print(f"Error loading CSV: {e}")
@@ -459,20 +602,9 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         with open(file_name, "w", newline="", encoding="utf-8") as file:
             writer = csv.writer(file)
 
-            # Write header row
-            headers = []
-            for col in range(self.parameter_table.columnCount() - 1): #We dont want the readback column.
-                header = self.parameter_table.horizontalHeaderItem(col)
-                headers.append(header.text() if header else "")
-            writer.writerow(headers)
-
-            # Write table data
-            for row in range(self.parameter_table.rowCount()):
-                row_data = []
-                for col in range(self.parameter_table.columnCount() - 1): #We dont want the readback column.
-                    item = self.parameter_table.item(row, col)
-                    row_data.append(item.text() if item else "")
-                writer.writerow(row_data)
+            # Header and table data, without the readback column
+            writer.writerow(self.parameter_model.headers[:-1])
+            writer.writerows(self.parameter_model.table_rows())
 
     def load_json_file(self):
         options = QFileDialog.Options()
@@ -575,59 +707,50 @@ class DaytonaGUI(QtWidgets.QMainWindow):
 
         return intent
     
-    def generate_tt(self):
+    def build_tt_intent(self):
         twr_dictionarys_list = []
         for table in self.twr_tables:
             if not self.is_twr_table_empty(table):
                 is_tblA = True if table == self.pathA_tbl else False
                 twr_dictionarys_list.append(self.get_twrs_from_tables(table, pathA=is_tblA))
-        intent = self.build_intent(twr_dictionarys_list)
-        tt = Daytona_HDC_tt(intent=intent) if intent['HDCpath'] == 'Both' else Daytona_SinglePath_tt(intent=intent)
-        tt_dictionary = tt.get_tts()
-        tt_dict = {}
-        for module in list(tt_dictionary.keys()):
-            step_info = []
-            last_time = 0.0
-            for item in tt_dictionary[module]:
-                step_info.append({
-                    "opcode": item.opcode.value,
-                    "ticks": int(round((round(float(item.abs_time_ms), 1) - last_time) * 10.0)), #to clock ticks
-                    "address": int(item.canonical_name) if item.opcode.value == "C0" else self.parameter_mapping(item.canonical_name),
-                    "setpoint": item.setpoint
-                })
-                last_time = float(item.abs_time_ms)
-            tt_dict[module] = step_info
-        self.create_popup(tt_dict)
+        return self.build_intent(twr_dictionarys_list)
+
+    def generate_tt(self):
+        intent = self.build_tt_intent()
+        tt_tables = self.tt_compiler.update(intent)
+
+        if self.tt_compiler.unresolved:
+            print(unresolved_message(self.tt_compiler.unresolved))
+
+        reports = self.tt_compiler.reports.values()
+        saved = sum(report.lines_saved for report in reports)
+        if saved:
+            print(f"Timing tables optimized, {saved} redundant lines removed: "
+                  + ", ".join(f"board {report.board_id} {report.lines_before} -> {report.lines_after}"
+                              for report in reports if report.lines_saved))
+
+        self.create_popup(tt_tables)
+
+    def preview_tt(self, *args):
+        '''
+        Recompile the timing table as the intent is edited and refresh the popup if it is open.
+        Only the phases that read the edited fields are rebuilt.
+        '''
+        if self.popup is None or not self.popup.isVisible():
+            return
+
+        try:
+            intent = self.build_tt_intent()
+            tt_tables = self.tt_compiler.update(intent)
+        except (ValueError, TypeError, KeyError):
+            return #Incomplete input while typing
+
+        self.popup.set_tt_data(tt_tables)
     
     def create_popup(self, tt_dict):
         self.popup = ttPopup(tt_dict)
         self.popup.show()
     
-    def fpga_register_lookup(self, board_id, parameter):
-        if board_id == 0:
-            fpga_address = format(SC[int(parameter)], 'x').upper()
-            return fpga_address
-        elif board_id == 4 or board_id == 5 or board_id == 6:
-            fpga_address = format(TW[int(parameter)], 'x').upper()
-            return fpga_address
-        else:
-            print(f"No FPGA address found for Board ID {board_id} and Parameter {parameter}")
-            return None
-
-    def parameter_mapping(self, canonical_name):
-        with open(os.path.join(os.path.dirname(__file__), "config", "daytona_canonical_names.csv"), newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                if row['Canonical Name'] == canonical_name:
-                    board_id = int(row['Board ID'])
-                    parameter = row['Parameter']
-                    fpga_address = self.fpga_register_lookup(board_id, parameter)
-                    return fpga_address
-                elif "0x" in canonical_name:
-                    return format(int(canonical_name, 16), 'x').upper()
-        # Not found → return None or default values
-        return None, None
-
     def update_twr_gui_tables(self, data_dict):
         twr_keys = ['pathA_traveling_wave_profile', 'pathB_traveling_wave_profile']
         self.pathA_tbl.clearContents()
@@ -635,10 +758,11 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         for key in twr_keys:
             table = self.pathA_tbl if key == 'pathA_traveling_wave_profile' else self.pathB_tbl
             if key in data_dict:
-                ramps = data_dict[key]['ramps']
+                profile = expand_profile(data_dict[key]) #Curve defined ramps are shown as their fitted breakpoints
+                ramps = profile['ramps']
                 if len(ramps) > 0:          
                     table.setRowCount(len(ramps) + 1)  # +1 for initial state
-                    initial_state = data_dict[key]['initial_state']
+                    initial_state = profile['initial_state']
                     table.setItem(0, 0, QTableWidgetItem(str(0)))
                     table.setItem(0, 1, QTableWidgetItem(str(initial_state['frequency'])))
                     table.setItem(0, 2, QTableWidgetItem(str(initial_state['amplitude'])))
@@ -707,33 +831,22 @@ class DaytonaGUI(QtWidgets.QMainWindow):
         return True
 
     def filter_parameter_table(self):
+        '''
+        Show only the method rows whose selected column contains the filter text, through the filter proxy.
+        '''
         if self.applyFilterBox.isChecked():
-            filter_text = self.input_filter_text.text().lower()
+            filter_text = self.input_filter_text.text()
             filter_column_name = self.column_combo_box.currentText()
 
             # Get column index from header text
-            column_index = None
-            for col in range(self.parameter_table.columnCount()):
-                header = self.parameter_table.horizontalHeaderItem(col)
-                if header and header.text() == filter_column_name:
-                    column_index = col
-                    break
-
-            if column_index is None:
+            if filter_column_name not in self.parameter_model.headers:
                 return
 
-            for row in range(self.parameter_table.rowCount()):
-                item = self.parameter_table.item(row, column_index)
-
-                if item and filter_text in item.text().lower():
-                    self.parameter_table.setRowHidden(row, False)
-                else:
-                    self.parameter_table.setRowHidden(row, True)
+            self.parameter_proxy.set_filter(self.parameter_model.headers.index(filter_column_name), filter_text)
 
         else:
             # Show all rows if filter is disabled
-            for row in range(self.parameter_table.rowCount()):
-                self.parameter_table.setRowHidden(row, False)
+            self.parameter_proxy.set_filter(None, "")
     
     def refreshCOMports(self):
         list_of_coms = self.led_strip.find_ports()
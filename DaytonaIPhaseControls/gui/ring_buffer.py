@@ -0,0 +1,62 @@
+import numpy as np
+
+class SeriesRingBuffer:
+    '''
+    Fixed capacity history of timestamped samples for several channels, preallocated once.
+
+    Every sample is stored twice, at slot i and at slot i + capacity, so the retained history is always one
+    contiguous slice of the doubled arrays: times() and channel() return views, never copies, and appending is a
+    vectorized write of the new block with no shifting of old data.
+    '''
+
+    def __init__(self, capacity, channels):
+        self.capacity = int(capacity)
+        self.channels = int(channels)
+        self.timestamps = np.full(2 * self.capacity, np.nan)
+        self.values = np.full((self.channels, 2 * self.capacity), np.nan) #Channel major, each channel view is contiguous
+        self.head = 0 #Next slot to write
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def extend(self, timestamps, samples):
+        '''
+        Append timestamps[sample] and samples[sample, channel], keeping only the newest capacity samples.
+        '''
+        timestamps = np.asarray(timestamps, dtype=np.float64)[-self.capacity:]
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, self.channels)[-self.capacity:]
+        n = len(timestamps)
+
+        if n == 0:
+            return
+
+        slots = (self.head + np.arange(n)) % self.capacity
+        for offset in (0, self.capacity):
+            self.timestamps[slots + offset] = timestamps
+            self.values[:, slots + offset] = samples.T
+
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+
+    def window(self):
+        start = (self.head - self.count) % self.capacity
+        return slice(start, start + self.count)
+
+    def times(self):
+        return self.timestamps[self.window()]
+
+    def channel(self, index):
+        return self.values[index, self.window()]
+
+    def latest(self):
+        '''
+        Values of the newest sample, one per channel.
+        '''
+        if not self.count:
+            return np.full(self.channels, np.nan)
+        return self.values[:, (self.head - 1) % self.capacity]
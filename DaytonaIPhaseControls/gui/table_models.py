@@ -0,0 +1,279 @@
+import numpy as np
+from functools import reduce
+from PyQt5.QtCore import Qt, QAbstractTableModel, QSortFilterProxyModel, QModelIndex
+from tt_engine.tt_dataclass import TT_DTYPE, OPCODES_BY_VALUE
+from tt_engine.tt_compiler import format_address
+
+SEARCH_GRAM = 3 #Longest substring indexed directly, longer queries intersect their trigrams
+
+class ColumnSearchIndex:
+    '''
+    Case insensitive substring search over one column: every 1..SEARCH_GRAM character substring of every cell maps
+    to the sorted rows containing it. Queries up to SEARCH_GRAM characters are a single lookup; longer ones only
+    check the rows that contain all of their trigrams.
+    '''
+
+    def __init__(self, texts):
+        self.texts = [text.lower() for text in texts]
+        grams = {}
+        for row, text in enumerate(self.texts):
+            for n in range(1, SEARCH_GRAM + 1):
+                for start in range(len(text) - n + 1):
+                    grams.setdefault(text[start:start + n], set()).add(row)
+        self.postings = {gram: np.fromiter(sorted(rows), dtype=np.int64, count=len(rows)) for gram, rows in grams.items()}
+
+    def match(self, query):
+        '''
+        Mask of the rows whose text contains query.
+        '''
+        query = query.lower()
+        mask = np.zeros(len(self.texts), dtype=bool)
+        empty = np.empty(0, dtype=np.int64)
+
+        if not query:
+            mask[:] = True
+        elif len(query) <= SEARCH_GRAM:
+            mask[self.postings.get(query, empty)] = True
+        else:
+            candidates = reduce(np.intersect1d, (self.postings.get(query[start:start + SEARCH_GRAM], empty)
+                                                 for start in range(len(query) - SEARCH_GRAM + 1)))
+            for row in candidates:
+                mask[row] = query in self.texts[row]
+
+        return mask
+
+class ChannelTableModel(QAbstractTableModel):
+    '''
+    Editable table of channels held as one object array per column, the last column being the readback.
+
+    Rows are addressed as "@board_id.parameter" from the board and parameter columns. Loading a method replaces the
+    arrays in one model reset, and a readback refresh writes the readback column in place and emits a single
+    dataChanged over the rows it touched, so no per cell items are ever created.
+    '''
+
+    def __init__(self, headers, board_column=1, parameter_column=2, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.board_column = board_column
+        self.parameter_column = parameter_column
+        self.rows = 0
+        self.columns = [self.empty_column(0) for _ in self.headers]
+        self.channel_rows = None #"@board.parameter" -> row indices, rebuilt lazily after edits
+        self.search_indexes = {} #column -> ColumnSearchIndex, rebuilt lazily after edits
+
+    @staticmethod
+    def empty_column(rows):
+        column = np.empty(rows, dtype=object)
+        column.fill("")
+        return column
+
+    @property
+    def readback_column(self):
+        return len(self.headers) - 1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        value = self.columns[index.column()][index.row()]
+        return "" if value is None else str(value)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        self.columns[index.column()][index.row()] = value
+        if index.column() in (self.board_column, self.parameter_column):
+            self.channel_rows = None
+        self.search_indexes.pop(index.column(), None)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() != self.readback_column:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return str(section + 1)
+
+    def insertRows(self, row, count, parent=QModelIndex()):
+        self.beginInsertRows(parent, row, row + count - 1)
+        self.columns = [np.insert(column, row, self.empty_column(count)) for column in self.columns]
+        self.rows += count
+        self.channel_rows = None
+        self.search_indexes = {}
+        self.endInsertRows()
+        return True
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        self.beginRemoveRows(parent, row, row + count - 1)
+        self.columns = [np.delete(column, np.s_[row:row + count]) for column in self.columns]
+        self.rows -= count
+        self.channel_rows = None
+        self.search_indexes = {}
+        self.endRemoveRows()
+        return True
+
+    def load(self, rows, headers=None):
+        '''
+        Replace the contents with rows of cell text (missing cells are blank). The readback column starts empty.
+        '''
+        self.beginResetModel()
+        if headers is not None:
+            self.headers = list(headers)
+        self.rows = len(rows)
+        self.columns = [self.empty_column(self.rows) for _ in self.headers]
+        for column in range(len(self.headers) - 1):
+            self.columns[column][:] = [row[column] if column < len(row) else "" for row in rows]
+        self.channel_rows = None
+        self.search_indexes = {}
+        self.endResetModel()
+
+    def text(self, row, column):
+        value = self.columns[column][row]
+        return "" if value is None else str(value)
+
+    def table_rows(self, include_readback=False):
+        '''
+        Cell text row by row, without the readback column unless asked for.
+        '''
+        count = len(self.headers) if include_readback else self.readback_column
+        return [[self.text(row, column) for column in range(count)] for row in range(self.rows)]
+
+    def search_index(self, column):
+        if column not in self.search_indexes:
+            self.search_indexes[column] = ColumnSearchIndex([self.text(row, column) for row in range(self.rows)])
+        return self.search_indexes[column]
+
+    def channel_name(self, row):
+        '''
+        "@board_id.parameter" channel name of a row, None if the row has no board_id or parameter.
+        '''
+        board_id = self.text(row, self.board_column)
+        parameter = self.text(row, self.parameter_column)
+        if not board_id or not parameter:
+            return None
+        return f"@{board_id}.{parameter}"
+
+    def channel_names(self):
+        return [self.channel_name(row) for row in range(self.rows)]
+
+    def rows_for_channels(self):
+        if self.channel_rows is None:
+            self.channel_rows = {}
+            for row, name in enumerate(self.channel_names()):
+                if name is not None:
+                    self.channel_rows.setdefault(name, []).append(row)
+        return self.channel_rows
+
+    def set_readbacks(self, values):
+        '''
+        Write readbacks given per channel name ({name: value}) or per row (a sequence, None or NaN leaves a row
+        unchanged) into the readback column, with one dataChanged for the rows covered.
+        '''
+        column = self.columns[self.readback_column]
+
+        if isinstance(values, dict):
+            channel_rows = self.rows_for_channels()
+            rows = []
+            for name, value in values.items():
+                for row in channel_rows.get(name, ()):
+                    column[row] = value
+                    rows.append(row)
+        else:
+            values = list(values)[:self.rows]
+            rows = [row for row, value in enumerate(values) if value is not None and value == value] #Skip NaN
+            column[rows] = [values[row] for row in rows]
+
+        if rows:
+            self.search_indexes.pop(self.readback_column, None)
+            self.dataChanged.emit(self.index(min(rows), self.readback_column),
+                                  self.index(max(rows), self.readback_column), [Qt.DisplayRole])
+
+class ChannelFilterProxyModel(QSortFilterProxyModel):
+    '''
+    Shows the rows of a ChannelTableModel whose filter column contains the filter text, using the model's search
+    index. The match mask is computed once per filter and kept until the indexed column changes.
+    '''
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filter_column = None
+        self.filter_text = ""
+        self.mask = None
+        self.mask_index = None #ColumnSearchIndex the mask was computed from
+
+    def set_filter(self, column, text):
+        '''
+        Filter on column (None shows every row).
+        '''
+        self.filter_column = column
+        self.filter_text = text
+        self.mask_index = None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.filter_column is None or not self.filter_text:
+            return True
+
+        index = self.sourceModel().search_index(self.filter_column)
+        if self.mask_index is not index:
+            self.mask = index.match(self.filter_text)
+            self.mask_index = index
+
+        return bool(self.mask[source_row]) if source_row < len(self.mask) else True
+
+class TimingTableModel(QAbstractTableModel):
+    '''
+    Read only view of one board's compiled TT_DTYPE table. Cells are formatted from the array only when the view
+    asks for them, so opening a table costs the same for ten lines as for a hundred thousand.
+    '''
+
+    headers = ["Opcode", "Ticks", "Address", "Value"]
+    fields = ["opcode", "ticks", "address", "setpoint"]
+
+    def __init__(self, table=None, parent=None):
+        super().__init__(parent)
+        self.table = np.empty(0, dtype=TT_DTYPE) if table is None else table
+
+    def set_table(self, table):
+        self.beginResetModel()
+        self.table = table
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.table)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        line = self.table[index.row()]
+        column = index.column()
+        if column == 0:
+            return OPCODES_BY_VALUE[int(line['opcode'])].value
+        if column == 2:
+            return str(format_address(OPCODES_BY_VALUE[int(line['opcode'])], int(line['address'])))
+        return str(line[self.fields[column]].item())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section) #Line numbers, the LOOP targets
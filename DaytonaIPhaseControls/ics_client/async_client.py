@@ -0,0 +1,123 @@
+import json
+import asyncio
+import aiohttp
+from ics_client.client import ICSRequestError
+
+RETRY_STATUS = (502, 503, 504)
+
+class AsyncICS_Client:
+    '''
+    asyncio counterpart of ICS_Client, for overlapping many requests without a thread per call.
+
+    send_request has the same arguments and results as ICS_Client.send_request: the decoded JSON response, or an
+    ICSRequestError. GET requests are retried with exponential backoff like the synchronous client. The session is
+    created on first use inside the running event loop; use the client as an async context manager or call close().
+    '''
+
+    def __init__(self, base_url, timeout = 10, connect_timeout = 3.05, retries = 3, backoff_factor = 0.1, max_connections = 10):
+        self.base_url = base_url
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_connections = max_connections
+        self.session = None
+
+        self.headers = {
+            'Content-Type': 'application/json'
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.max_connections)
+            self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+        return self.session
+
+    async def send_request(self, endpoint, port, method='GET', data=None, deadline=None):
+        '''
+        Send a request to the ICS. deadline (seconds) bounds the whole request, retries included.
+        '''
+        url = f"http://{self.base_url}:{port}/{endpoint}"
+        try:
+            return await asyncio.wait_for(self._send(url, method, data), deadline)
+        except asyncio.TimeoutError as e:
+            error = ICSRequestError('timeout', method, url, str(e) or f"no response within {deadline} s")
+        except aiohttp.ClientResponseError as e:
+            error = ICSRequestError('http', method, url, e.message, e.status)
+        except json.JSONDecodeError as e:
+            error = ICSRequestError('decode', method, url, str(e))
+        except aiohttp.ClientConnectionError as e:
+            error = ICSRequestError('connection', method, url, str(e))
+        except aiohttp.ClientError as e:
+            error = ICSRequestError('request', method, url, str(e))
+
+        return error
+
+    async def _send(self, url, method, data):
+        session = self.get_session()
+        attempts = self.retries + 1 if method == 'GET' else 1
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                if method == 'GET':
+                    params = {'channels': data} if data is not None else None
+                    request = session.get(url, params=params)
+                elif method == 'POST':
+                    request = session.post(url, json=data)
+                elif method == 'PUT':
+                    request = session.put(url, json=data)
+                else:
+                    raise ValueError("Unsupported HTTP method")
+
+                async with request as response:
+                    if response.status in RETRY_STATUS and not last_attempt:
+                        await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+                        continue
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last_attempt:
+                    raise
+                await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+
+    async def gather_requests(self, requests, max_concurrency=8, deadline=None):
+        '''
+        Run many requests concurrently, at most max_concurrency in flight.
+        requests is a list of send_request keyword dictionaries; results are returned in the same order.
+        '''
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(request):
+            async with semaphore:
+                return await self.send_request(**{'deadline': deadline, **request})
+
+        return await asyncio.gather(*(bounded(request) for request in requests))
+
+    async def read_channels(self, channel_groups, port=8001, max_concurrency=8, deadline=None):
+        '''
+        Read several groups of canonical names concurrently, one GET per group. Returns one result per group.
+        '''
+        return await self.gather_requests([
+            {'endpoint': 'api/ics/channels/', 'port': port, 'method': 'GET', 'data': ";".join(names)}
+            for names in channel_groups
+        ], max_concurrency, deadline)
+
+    async def write_channels(self, payloads, port=8001, max_concurrency=8, deadline=None):
+        '''
+        Post several setpoint payloads ([{"canonical_name", "value"}, ...]) concurrently. Returns one result per payload.
+        '''
+        return await self.gather_requests([
+            {'endpoint': 'api/ics/channels/', 'port': port, 'method': 'POST', 'data': payload}
+            for payload in payloads
+        ], max_concurrency, deadline)
@@ -1,30 +1,194 @@
+import time
 import requests
+from dataclasses import dataclass, field
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import TimeoutError, NewConnectionError
+
+class ICSRequestError(Exception):
+    '''
+    Failed ICS request. Returned (not raised) by ICS_Client.send_request in place of the response data.
+    kind is one of 'connection', 'timeout', 'http', 'decode' or 'request'.
+    '''
+
+    def __init__(self, kind, method, url, message, status_code=None):
+        super().__init__(f"{method} {url} failed ({kind}): {message}")
+        self.kind = kind
+        self.method = method
+        self.url = url
+        self.message = message
+        self.status_code = status_code
+
+@dataclass
+class ChunkTiming:
+    names: list[str]
+    seconds: float
+    error: ICSRequestError | None = None
+
+@dataclass
+class ChannelReadResult:
+    '''
+    Merged result of a chunked channel read. Every requested name is in exactly one of values or errors.
+    '''
+    values: dict[str, object] = field(default_factory=dict)
+    errors: dict[str, object] = field(default_factory=dict)
+    chunks: list[ChunkTiming] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def slowest_chunk(self):
+        return max(self.chunks, key=lambda chunk: chunk.seconds, default=None)
+
+def chunk_channels(names, chunk_size=32, max_query_length=1500):
+    '''
+    Split channel names into chunks of at most chunk_size names whose ';' joined, URL encoded query stays within
+    max_query_length characters. A single name longer than the limit gets a chunk of its own.
+    '''
+    chunks = []
+    chunk = []
+    length = 0
+
+    for name in names:
+        name_length = len(quote(name, safe='')) + (3 if chunk else 0) #';' is encoded as %3B
+        if chunk and (len(chunk) >= chunk_size or length + name_length > max_query_length):
+            chunks.append(chunk)
+            chunk = []
+            length = 0
+            name_length -= 3
+        chunk.append(name)
+        length += name_length
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+def merge_chunk(names, response, result):
+    '''
+    Assign one chunk's response items to their channel names. Items carrying a canonical_name are matched by name;
+    otherwise the response must hold one item per requested name, in request order.
+    '''
+    if isinstance(response, Exception):
+        result.errors.update((name, response) for name in names)
+        return
+
+    requested = set(names)
+    by_name = {item.get("canonical_name"): item for item in response if isinstance(item, dict)}
+
+    if not requested.issubset(by_name):
+        if len(response) != len(names):
+            error = f"expected {len(names)} readbacks, got {len(response)}"
+            result.errors.update((name, error) for name in names)
+            return
+        by_name = dict(zip(names, response))
+
+    for name in names:
+        item = by_name[name]
+        if item.get("error"):
+            result.errors[name] = item["error"]
+        else:
+            result.values[name] = item["value"]
 
 class ICS_Client:
-    def __init__(self, base_url, timeout = 10):
+    '''
+    HTTP client for the ICS API.
+
+    Requests go through one keep-alive session with a connection pool per host/port, so continuous polling reuses
+    its connections. GET requests are idempotent and retried with exponential backoff on connection errors and
+    502/503/504 responses; POST and PUT are sent once.
+    '''
+
+    def __init__(self, base_url, timeout = 10, connect_timeout = 3.05, retries = 3, backoff_factor = 0.1, pool_maxsize = 10):
         self.base_url = base_url
-        self.timeout = timeout
+        self.timeout = (connect_timeout, timeout) #requests takes (connect, read)
         self.token = None
 
         self.headers = {
             'Content-Type': 'application/json'
         }
 
+        retry = Retry(total=retries,
+                      backoff_factor=backoff_factor,
+                      status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({'GET'}),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.read_workers = min(4, pool_maxsize)
+        self.executor = None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def send_request(self, endpoint, port, method='GET', data=None):
+        '''
+        Send a request to the ICS and return the decoded JSON response, or an ICSRequestError describing the failure.
+        '''
         url = f"http://{self.base_url}:{port}/{endpoint}"
         try:
             if method == 'GET':
                 params = {'channels': data}
-                response = requests.get(url, params=params, headers=self.headers, timeout=self.timeout)
+                response = self.session.get(url, params=params, timeout=self.timeout)
             elif method == 'POST':
-                response = requests.post(url, json=data, headers=self.headers, timeout=self.timeout)
+                response = self.session.post(url, json=data, timeout=self.timeout)
             elif method == 'PUT':
-                response = requests.put(url, json=data, headers=self.headers, timeout=self.timeout)
+                response = self.session.put(url, json=data, timeout=self.timeout)
             else:
                 raise ValueError("Unsupported HTTP method")
 
             response.raise_for_status()
             return response.json()
+        except requests.exceptions.HTTPError as e:
+            error = ICSRequestError('http', method, url, str(e), e.response.status_code if e.response is not None else None)
+        except requests.exceptions.Timeout as e:
+            error = ICSRequestError('timeout', method, url, str(e))
+        except requests.exceptions.ConnectionError as e:
+            reason = getattr(e.args[0], 'reason', None) if e.args else None #Retried timeouts arrive wrapped in MaxRetryError
+            error = ICSRequestError('timeout' if isinstance(reason, TimeoutError) and not isinstance(reason, NewConnectionError) else 'connection', method, url, str(e))
+        except requests.exceptions.JSONDecodeError as e:
+            error = ICSRequestError('decode', method, url, str(e), response.status_code)
         except requests.exceptions.RequestException as e:
-            print(f"Request failed: {e}")
-            return None
\ No newline at end of file
+            error = ICSRequestError('request', method, url, str(e))
+
+        return error
+
+    def read_channels(self, names, port=8001, chunk_size=32, max_query_length=1500):
+        '''
+        Read channels in size bounded chunks issued in parallel, so a long channel list neither overflows the URL nor
+        waits on one slow request. Results are merged by canonical name into a ChannelReadResult, with the timing
+        of every chunk for diagnosis.
+        '''
+        names = list(dict.fromkeys(names)) #Each channel once, in order
+        chunks = chunk_channels(names, chunk_size, max_query_length)
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix='ics_read')
+
+        def read_chunk(chunk):
+            start = time.perf_counter()
+            response = self.send_request('api/ics/channels/', port, method='GET', data=";".join(chunk))
+            return response, time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = ChannelReadResult()
+
+        for chunk, (response, seconds) in zip(chunks, self.executor.map(read_chunk, chunks)):
+            result.chunks.append(ChunkTiming(chunk, seconds, response if isinstance(response, Exception) else None))
+            merge_chunk(chunk, response, result)
+
+        result.seconds = time.perf_counter() - start
+        return result
@@ -0,0 +1,112 @@
+import time
+import threading
+from ics_client.client import ChannelReadResult
+
+DEFAULT_MAX_AGE_S = 0.1
+
+class PendingRead:
+    '''
+    A read in progress that other callers asking for the same channels wait on instead of sending their own.
+    '''
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+class ReadbackCache:
+    '''
+    Readback cache in front of ICS_Client.read_channels, keyed by canonical name.
+
+    A channel read less than max_age_s ago is served from the cache. Channels that another thread is already reading
+    are waited on, and only the remaining ones go out, as one batched read_channels call. Failed reads are not cached,
+    nor are reads of a channel that was invalidated while they were in flight: they may predate the write that caused
+    the invalidation. Safe to share between the GUI's request pool and the acquisition thread.
+    '''
+
+    def __init__(self, client, max_age_s=DEFAULT_MAX_AGE_S):
+        self.client = client
+        self.max_age_s = max_age_s
+        self.lock = threading.Lock()
+        self.entries = {} #canonical name -> (value, monotonic time the read was issued)
+        self.pending = {} #canonical name -> PendingRead
+        self.generation = 0 #Bumped by invalidate() of every channel
+        self.generations = {} #canonical name -> times it was invalidated on its own
+        self.hits = 0
+        self.misses = 0
+
+    def read_channels(self, names, port=8001, max_age_s=None, **kwargs):
+        '''
+        Same result as ICS_Client.read_channels, with channels fresher than max_age_s (default self.max_age_s) taken
+        from the cache.
+        '''
+        max_age_s = self.max_age_s if max_age_s is None else max_age_s
+        names = list(dict.fromkeys(names))
+        start = time.monotonic()
+        result = ChannelReadResult()
+        waiting = []
+        missing = []
+
+        with self.lock:
+            for name in names:
+                entry = self.entries.get(name)
+                if entry is not None and start - entry[1] <= max_age_s:
+                    result.values[name] = entry[0]
+                elif name in self.pending:
+                    waiting.append((name, self.pending[name]))
+                else:
+                    missing.append(name)
+
+            fetch = PendingRead() if missing else None
+            for name in missing:
+                self.pending[name] = fetch
+            issued = {name: (self.generation, self.generations.get(name, 0)) for name in missing}
+            self.hits += len(names) - len(missing)
+            self.misses += len(missing)
+
+        if fetch is not None:
+            try:
+                fetch.result = self.client.read_channels(missing, port, **kwargs)
+            finally:
+                with self.lock:
+                    if fetch.result is not None:
+                        for name, value in fetch.result.values.items():
+                            if issued.get(name) == (self.generation, self.generations.get(name, 0)):
+                                self.entries[name] = (value, start)
+                    for name in missing:
+                        if self.pending.get(name) is fetch:
+                            del self.pending[name]
+                fetch.done.set()
+
+            self.merge(missing, fetch.result, result)
+            result.chunks.extend(fetch.result.chunks)
+
+        for name, other in waiting:
+            other.done.wait()
+            self.merge([name], other.result, result)
+
+        result.seconds = time.monotonic() - start
+        return result
+
+    def merge(self, names, source, result):
+        for name in names:
+            if source is None:
+                result.errors[name] = 'read failed'
+            elif name in source.values:
+                result.values[name] = source.values[name]
+            else:
+                result.errors[name] = source.errors.get(name, 'no readback')
+
+    def invalidate(self, names=None):
+        '''
+        Drop cached readbacks, e.g. after setpoints were written. All of them when names is None.
+        '''
+        with self.lock:
+            if names is None:
+                self.generation += 1
+                self.entries.clear()
+                self.pending.clear()
+            else:
+                for name in names:
+                    self.generations[name] = self.generations.get(name, 0) + 1
+                    self.entries.pop(name, None)
+                    self.pending.pop(name, None) #Later reads must not wait on a read issued before the write
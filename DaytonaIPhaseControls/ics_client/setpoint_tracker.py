@@ -0,0 +1,127 @@
+import time
+import threading
+from dataclasses import dataclass, field
+
+def normalize(value):
+    '''
+    Comparable form of a setpoint: numbers (and numeric text) as float, anything else as stripped text.
+    '''
+    if isinstance(value, str):
+        value = value.strip()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+def same_value(a, b, tolerance=0.0):
+    a, b = normalize(a), normalize(b)
+    if isinstance(a, float) and isinstance(b, float):
+        return abs(a - b) <= tolerance
+    return a == b
+
+@dataclass
+class SetpointMismatch:
+    canonical_name: str
+    requested: object
+    readback: object
+
+@dataclass
+class SetpointPushResult:
+    '''
+    Outcome of a delta push. sent channels were POSTed, skipped ones already held the requested value.
+    '''
+    sent: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    response: object = None
+    rejected: dict[str, object] = field(default_factory=dict)
+    mismatches: list[SetpointMismatch] = field(default_factory=list)
+    verified: bool = False
+    seconds: float = 0.0
+
+    def report(self):
+        lines = [f"Setpoints: {len(self.sent)} sent, {len(self.skipped)} unchanged, {self.seconds:.3f} s"]
+        lines += [f"  rejected {name}: {error}" for name, error in self.rejected.items()]
+        if self.verified:
+            lines += [f"  {m.canonical_name}: requested {m.requested}, readback {m.readback}" for m in self.mismatches]
+            if not self.mismatches:
+                lines.append(f"  verified {len(self.sent) - len(self.rejected)} channels")
+        return "\n".join(lines)
+
+class SetpointTracker:
+    '''
+    Last acknowledged setpoint per canonical name, so only changed channels are sent to the ICS.
+
+    A setpoint counts as acknowledged once the POST succeeded and the ICS reported no error for it. Rejected,
+    failed or (when verifying) mismatching channels are forgotten, so the next push sends them again. Call reset()
+    whenever the instrument state may have changed behind our back, e.g. after reconnecting.
+    '''
+
+    def __init__(self, client, port=8001, tolerance=1e-9):
+        self.client = client
+        self.port = port
+        self.tolerance = tolerance
+        self.lock = threading.Lock()
+        self.acknowledged = {}
+
+    def reset(self, names=None):
+        with self.lock:
+            if names is None:
+                self.acknowledged.clear()
+            else:
+                for name in names:
+                    self.acknowledged.pop(name, None)
+
+    def changes(self, setpoints):
+        '''
+        The (canonical_name, value) pairs whose value differs from the acknowledged one. The last entry wins when a
+        channel appears more than once.
+        '''
+        with self.lock:
+            return [(name, value) for name, value in dict(setpoints).items()
+                    if name not in self.acknowledged or not same_value(self.acknowledged[name], value, self.tolerance)]
+
+    def acknowledge(self, sent, response, result):
+        '''
+        Record the sent values the ICS accepted. Per channel errors in the response are collected in result.rejected.
+        '''
+        if isinstance(response, Exception):
+            result.rejected.update((name, response) for name, _ in sent)
+        elif isinstance(response, list):
+            for item in response:
+                if isinstance(item, dict) and item.get("error"):
+                    result.rejected[item.get("canonical_name")] = item["error"]
+
+        with self.lock:
+            for name, value in sent:
+                if name in result.rejected:
+                    self.acknowledged.pop(name, None)
+                else:
+                    self.acknowledged[name] = value
+
+    def push(self, setpoints, verify=False, verify_tolerance=1e-6):
+        '''
+        POST only the changed setpoints, optionally reading those channels back and reporting the ones that differ.
+        '''
+        start = time.perf_counter()
+        setpoints = dict(setpoints)
+        sent = self.changes(setpoints.items())
+        result = SetpointPushResult(sent=[name for name, _ in sent])
+        result.skipped = [name for name in setpoints if name not in set(result.sent)]
+
+        if sent:
+            payload = [{"canonical_name": name, "value": value} for name, value in sent]
+            result.response = self.client.send_request('api/ics/channels/', self.port, method='POST', data=payload)
+            self.acknowledge(sent, result.response, result)
+
+            if verify:
+                written = [(name, value) for name, value in sent if name not in result.rejected]
+                readback = self.client.read_channels([name for name, _ in written], self.port)
+                for name, value in written:
+                    actual = readback.values.get(name, readback.errors.get(name))
+                    if name not in readback.values or not same_value(value, actual, verify_tolerance):
+                        result.mismatches.append(SetpointMismatch(name, value, actual))
+                self.reset([m.canonical_name for m in result.mismatches])
+                result.verified = True
+
+        result.seconds = time.perf_counter() - start
+        return result
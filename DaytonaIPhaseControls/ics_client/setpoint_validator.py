@@ -0,0 +1,171 @@
+import os
+import json
+import numpy as np
+from dataclasses import dataclass, field
+from tt_engine.address_resolver import PARAMETERS_JSON
+
+def parse_number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return np.nan
+
+@dataclass
+class ValidationResult:
+    '''
+    setpoints holds every channel that may be sent, in input order, with enum labels translated and values quantized
+    to the channel precision. Channels the parameters file does not describe are passed through unchanged and listed
+    in unknown; channels that match several of its entries are passed through unchanged as well and listed in
+    ambiguous with the canonical names they could be. A channel whose own canonical name is not in the file but whose
+    "@device.parameter" is gets its rule violations in warnings instead of errors and is passed through unchanged,
+    since that match is only inferred. Nothing should be sent while errors is not empty.
+    '''
+    setpoints: list[tuple[str, object]] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+    adjusted: dict[str, tuple[object, float]] = field(default_factory=dict) #Translated or rounded: (given, sent)
+    unknown: list[str] = field(default_factory=list)
+    ambiguous: dict[str, list[str]] = field(default_factory=dict)
+    warnings: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+class SetpointValidator:
+    '''
+    Setpoint rules from the gener8 parameters JSON (writability, min, max, precision, enum map), compiled into
+    per channel arrays so a whole method is checked and quantized in one vectorized pass.
+
+    Channels are found by canonical name first. "@device.parameter", the way the method tables address them, is only
+    used when no canonical name matches, and only resolves if a single entry has that device and parameter. scale is
+    kept with the rules but not applied: the method values are in the same units as min, max and precision. Call
+    refresh() to pick up edits to the parameters file; the table is only rebuilt when its modification time changed.
+    '''
+
+    def __init__(self, parameters_json=PARAMETERS_JSON):
+        self.parameters_json = parameters_json
+        self._mtime = None
+        self.refresh()
+
+    def refresh(self):
+        mtime = os.path.getmtime(self.parameters_json)
+
+        if mtime == self._mtime:
+            return False
+
+        with open(self.parameters_json, 'r') as f:
+            parameters = json.load(f)
+
+        self.names = [entry['canonical_name'] for entry in parameters]
+        self.by_name = {} #canonical name -> entry indices
+        self.by_channel = {} #"@device.parameter" -> entry indices, several where the pair repeats
+        for i, entry in enumerate(parameters):
+            self.by_name.setdefault(entry['canonical_name'], []).append(i)
+            self.by_channel.setdefault(f"@{entry['device']}.{entry['parameter']}", []).append(i)
+
+        def column(key):
+            return np.array([np.nan if entry[key] is None else float(entry[key]) for entry in parameters])
+
+        self.writable = np.array([entry['set_value'] is not None for entry in parameters])
+        self.minimum = column('min')
+        self.maximum = column('max')
+        self.precision = column('precision')
+        self.scale = column('scale')
+        self.maps = [entry['map'] or None for entry in parameters]
+        self._mtime = mtime
+        return True
+
+    def find(self, name, canonical_name=None):
+        '''
+        Entry indices matching a setpoint: by canonical_name, else by name as a canonical name, else by name as
+        "@device.parameter". More than one index means the setpoint is ambiguous.
+        '''
+        for key in (canonical_name, name):
+            if key in self.by_name:
+                return self.by_name[key]
+        return self.by_channel.get(name, [])
+
+    def values_for(self, rows, values):
+        '''
+        Numeric value of every setpoint (NaN if it is not a number or a label of the channel's map), and per row
+        whether it had to be an enum value.
+        '''
+        numbers = np.empty(len(rows))
+        enum = np.zeros(len(rows), dtype=bool)
+
+        for i, (row, value) in enumerate(zip(rows, values)):
+            text = value.strip() if isinstance(value, str) else value
+            mapping = self.maps[row] if row >= 0 else None
+            if mapping is not None:
+                enum[i] = True
+                numbers[i] = mapping[text] if text in mapping else parse_number(text)
+                if numbers[i] not in mapping.values():
+                    numbers[i] = np.nan
+            else:
+                numbers[i] = parse_number(text)
+
+        return numbers, enum
+
+    def validate(self, setpoints, canonical_names=None):
+        '''
+        Check and quantize (name, value) pairs against the parameter rules. canonical_names, if given, holds the
+        canonical name of every setpoint (or None) and is looked up before the setpoint's own name.
+        '''
+        setpoints = list(setpoints)
+        names = [name for name, _ in setpoints]
+        values = [value for _, value in setpoints]
+        canonical_names = [None] * len(names) if canonical_names is None else list(canonical_names)
+        matches = [self.find(name, canonical_name) for name, canonical_name in zip(names, canonical_names)]
+        rows = np.array([match[0] if len(match) == 1 else -1 for match in matches], dtype=np.int64)
+        known = rows >= 0
+        safe_rows = np.where(known, rows, 0)
+        inferred = [known[i] and canonical_names[i] is not None and canonical_names[i] not in self.by_name
+                    for i in range(len(names))]
+
+        numbers, enum = self.values_for(rows, values)
+        minimum = self.minimum[safe_rows]
+        maximum = self.maximum[safe_rows]
+        precision = self.precision[safe_rows]
+
+        read_only = known & ~self.writable[safe_rows]
+        invalid = known & ~read_only & np.isnan(numbers)
+        below = known & ~read_only & ~invalid & (numbers < minimum) #NaN bounds compare False, i.e. unbounded
+        above = known & ~read_only & ~invalid & (numbers > maximum)
+
+        step = np.where(precision > 0, precision, 1.0)
+        quantized = np.where(precision > 0, np.round(np.round(numbers / step) * step, 10), numbers)
+
+        result = ValidationResult()
+        problems = {}
+        for i in np.flatnonzero(read_only):
+            problems[i] = "read only"
+        for i in np.flatnonzero(invalid):
+            labels = list(self.maps[rows[i]]) if enum[i] else None
+            problems[i] = f"invalid value {values[i]!r}" + (f", expected one of {labels}" if labels else "")
+        for i in np.flatnonzero(below):
+            problems[i] = f"{values[i]} below minimum {minimum[i]:g}"
+        for i in np.flatnonzero(above):
+            problems[i] = f"{values[i]} above maximum {maximum[i]:g}"
+
+        for i, problem in problems.items():
+            if inferred[i]:
+                result.warnings[names[i]] = f"{problem} for {self.names[rows[i]]!r} (matched by device and parameter)"
+            else:
+                result.errors[names[i]] = problem
+
+        for i, name in enumerate(names):
+            if len(matches[i]) > 1:
+                result.ambiguous[name] = [self.names[row] for row in matches[i]]
+                result.setpoints.append((name, values[i]))
+            elif not known[i]:
+                result.unknown.append(name)
+                result.setpoints.append((name, values[i]))
+            elif name in result.warnings:
+                result.setpoints.append((name, values[i]))
+            elif name not in result.errors:
+                value = float(quantized[i])
+                if value != numbers[i] or isinstance(values[i], str) and parse_number(values[i]) != value:
+                    result.adjusted[name] = (values[i], value)
+                result.setpoints.append((name, value))
+
+        return result
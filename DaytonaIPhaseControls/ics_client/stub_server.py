@@ -0,0 +1,260 @@
+'''
+Local stand-in for the ICS HTTP API, for exercising ICS_Client and the GUI polling without an instrument.
+
+Implements
+    GET  api/ics/instrument/initialization/
+    GET  api/ics/channels/?channels=<name>;<name>;...   -> [{"canonical_name", "value"}, ...] in request order
+    POST api/ics/channels/  [{"canonical_name", "value"}, ...] -> the applied values
+    GET  api/stub/stats/                                 -> request counters
+
+Channels are seeded from daytona_gener8.parameters.json and can be addressed by canonical name or as
+"@device.parameter". Writes follow the parameter's rules: map entries translate names to values, values outside
+min/max are rejected, values are rounded to the precision, and channels without a set_value are read only.
+Latency, jitter and failure injection are configurable, e.g.
+
+    python -m ics_client.stub_server --port 8001 --latency 0.005 --jitter 0.002 --failure-rate 0.01
+'''
+import json
+import time
+import random
+import argparse
+import threading
+from dataclasses import dataclass
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from tt_engine.address_resolver import PARAMETERS_JSON
+
+@dataclass
+class StubChannel:
+    canonical_name: str
+    device: int
+    parameter: int | str
+    writable: bool
+    min: float | None
+    max: float | None
+    precision: float | None
+    map: dict | None
+    value: float
+
+    def apply(self, value):
+        '''
+        Value the instrument would hold after writing value, raises ValueError if the write is rejected.
+        '''
+        if not self.writable:
+            raise ValueError(f"{self.canonical_name} is read only")
+
+        if isinstance(value, str) and self.map and value in self.map:
+            value = self.map[value]
+
+        value = float(value)
+
+        if (self.min is not None and value < self.min) or (self.max is not None and value > self.max):
+            raise ValueError(f"{self.canonical_name} value {value} outside [{self.min}, {self.max}]")
+
+        if self.precision:
+            value = round(round(value / self.precision) * self.precision, 10)
+
+        return value
+
+class StubICS:
+    '''
+    Channel state and fault injection settings shared by the request handler threads.
+    '''
+
+    def __init__(self, parameters_json=PARAMETERS_JSON, latency=0.0, jitter=0.0, failure_rate=0.0, failure_status=503,
+                 noise=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.noise = noise
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.channels: dict[str, StubChannel] = {}
+        self.stats = {"requests": 0, "reads": 0, "channels_read": 0, "writes": 0, "failures": 0}
+
+        with open(parameters_json, 'r') as f:
+            parameters = json.load(f)
+
+        for entry in parameters:
+            precision = float(entry['precision']) if entry['precision'] is not None else None
+            start = entry['min'] if entry['min'] is not None else 0.0
+            channel = StubChannel(entry['canonical_name'], entry['device'], entry['parameter'], entry['set_value'] is not None,
+                                  entry['min'], entry['max'], precision, entry['map'], float(start))
+            self.channels.setdefault(channel.canonical_name, channel)
+            self.channels.setdefault(f"@{channel.device}.{channel.parameter}", channel)
+
+    def channel(self, name):
+        channel = self.channels.get(name)
+        if channel is None and name.startswith('@'): #GUI tables may carry float text, e.g. "@4.185.0"
+            device, _, parameter = name[1:].partition('.')
+            try:
+                channel = self.channels.get(f"@{int(float(device))}.{int(float(parameter))}")
+            except ValueError:
+                pass
+        return channel
+
+    def delay(self):
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_fail(self):
+        with self.lock:
+            self.stats["requests"] += 1
+            failed = self.random.random() < self.failure_rate
+            if failed:
+                self.stats["failures"] += 1
+        return failed
+
+    def read(self, names):
+        results = []
+        with self.lock:
+            self.stats["reads"] += 1
+            self.stats["channels_read"] += len(names)
+            for name in names:
+                channel = self.channel(name)
+                if channel is None:
+                    results.append({"canonical_name": name, "value": None, "error": "unknown channel"})
+                    continue
+                value = channel.value + (self.random.gauss(0.0, self.noise) if self.noise else 0.0)
+                results.append({"canonical_name": name, "value": value})
+        return results
+
+    def write(self, payload):
+        results = []
+        with self.lock:
+            self.stats["writes"] += 1
+            for item in payload:
+                name = item.get("canonical_name")
+                channel = self.channel(name) if isinstance(name, str) else None
+                if channel is None:
+                    results.append({"canonical_name": name, "value": None, "error": "unknown channel"})
+                    continue
+                try:
+                    channel.value = channel.apply(item.get("value"))
+                    results.append({"canonical_name": name, "value": channel.value})
+                except (TypeError, ValueError) as e:
+                    results.append({"canonical_name": name, "value": channel.value, "error": str(e)})
+        return results
+
+def make_handler(ics):
+
+    class StubICSHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1' #Keep-alive, like the instrument
+        disable_nagle_algorithm = True #Headers and body go out as separate writes
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, data, status=200):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def route(self):
+            url = urlsplit(self.path)
+            return url.path.strip('/'), parse_qs(url.query)
+
+        def begin(self):
+            '''
+            Apply the injected latency and failures, False if the request was answered with a failure.
+            '''
+            ics.delay()
+            if ics.should_fail():
+                self.send_json({"detail": "injected failure"}, ics.failure_status)
+                return False
+            return True
+
+        def do_GET(self):
+            path, query = self.route()
+
+            if path == 'api/stub/stats':
+                with ics.lock:
+                    self.send_json(dict(ics.stats))
+                return
+
+            if not self.begin():
+                return
+
+            if path == 'api/ics/instrument/initialization':
+                self.send_json({"initialized": True, "version": "stub", "channels": len(ics.channels)})
+            elif path == 'api/ics/channels':
+                names = [name for name in ';'.join(query.get('channels', [])).split(';') if name]
+                self.send_json(ics.read(names))
+            else:
+                self.send_json({"detail": "not found"}, 404)
+
+        def do_POST(self):
+            path, _ = self.route()
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+
+            if not self.begin():
+                return
+
+            if path != 'api/ics/channels':
+                self.send_json({"detail": "not found"}, 404)
+                return
+
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_json({"detail": "invalid JSON"}, 400)
+                return
+
+            if not isinstance(payload, list):
+                payload = [payload]
+
+            self.send_json(ics.write(payload))
+
+        do_PUT = do_POST
+
+    return StubICSHandler
+
+def serve(host='127.0.0.1', port=8001, **options):
+    '''
+    Create the stand-in server (not yet serving). Port 0 picks a free port, see server.server_address.
+    '''
+    server = ThreadingHTTPServer((host, port), make_handler(StubICS(**options)))
+    server.daemon_threads = True
+    return server
+
+def serve_in_thread(host='127.0.0.1', port=0, **options):
+    '''
+    Start the stand-in server on a background thread, for tests and benchmarks. Call server.shutdown() when done.
+    '''
+    server = serve(host, port, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the ICS HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--parameters", default=PARAMETERS_JSON, help="gener8 parameters JSON used to seed the channels")
+    parser.add_argument("--latency", type=float, default=0.0, help="Response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- variation of the delay in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with --failure-status")
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--noise", type=float, default=0.0, help="Standard deviation of the noise added to readbacks")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, parameters_json=args.parameters, latency=args.latency, jitter=args.jitter,
+                   failure_rate=args.failure_rate, failure_status=args.failure_status, noise=args.noise, seed=args.seed)
+    print(f"ICS stand-in listening on {args.host}:{server.server_address[1]}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+'''
+Level of detail access to recorded readback runs.
+
+The raw segments are only ever memory mapped. A min/max pyramid is built once per run with a single streaming pass
+over the records and cached next to them (pyramid/level_<k>_{time,min,max}.npy). Level k holds one block per
+PYRAMID_FACTOR**k samples: the block's first time stamp and the per-channel min and max. For a zoom window,
+HistoryView.window() picks the finest level that still fits in the requested number of points and returns only
+that slice, so the work per redraw is bounded by the screen, not by the length of the run.
+'''
+import os
+import numpy as np
+from recorder.readback_recorder import segment_paths, open_segment, iter_records
+
+PYRAMID_FACTOR = 16
+PYRAMID_MIN_BLOCKS = 1024 #Stop adding levels once a level is this small
+
+def reduce_blocks(times, minimums, maximums, factor):
+    '''
+    Merge every factor consecutive blocks (the last partial block included) into one.
+    '''
+    starts = np.arange(0, len(times), factor)
+    return (times[starts],
+            np.fmin.reduceat(minimums, starts, axis=0), #fmin/fmax skip NaN (failed reads)
+            np.fmax.reduceat(maximums, starts, axis=0))
+
+class HistoryView:
+
+    def __init__(self, run_dir, factor=PYRAMID_FACTOR):
+        self.run_dir = run_dir
+        self.factor = factor
+        self.segments = [open_segment(path) for path in segment_paths(run_dir)]
+
+        if not self.segments:
+            raise ValueError(f"{run_dir} has no recorded segments")
+
+        self.header = self.segments[0][0]
+        self.labels = self.header['labels']
+        self.channels = len(self.header['channels'])
+        self.records = [records for _, records in self.segments]
+        self.rows = sum(len(records) for records in self.records)
+
+        if not self.rows:
+            raise ValueError(f"{run_dir} has no recorded samples")
+
+        self.levels = self.load_pyramid()
+
+    def pyramid_dir(self):
+        return os.path.join(self.run_dir, 'pyramid')
+
+    def load_pyramid(self):
+        '''
+        Memory map the cached pyramid, building it first if it is missing or older than the recording.
+        '''
+        directory = self.pyramid_dir()
+        stamp = os.path.join(directory, 'rows.txt')
+
+        built_rows = None
+        if os.path.exists(stamp):
+            with open(stamp, 'r') as f:
+                built_rows = f.read().strip()
+
+        if built_rows != str(self.rows):
+            self.build_pyramid(directory)
+            with open(stamp, 'w') as f:
+                f.write(str(self.rows))
+
+        levels = []
+        k = 1
+        while os.path.exists(os.path.join(directory, f"level_{k}_time.npy")):
+            levels.append(tuple(np.load(os.path.join(directory, f"level_{k}_{name}.npy"), mmap_mode='r')
+                                for name in ('time', 'min', 'max')))
+            k += 1
+        return levels
+
+    def open_level(self, directory, k, blocks):
+        '''
+        New level k files of the given number of blocks, as writable memory maps.
+        '''
+        return (np.lib.format.open_memmap(os.path.join(directory, f"level_{k}_time.npy"), mode='w+', shape=(blocks,)),
+                np.lib.format.open_memmap(os.path.join(directory, f"level_{k}_min.npy"), mode='w+', shape=(blocks, self.channels)),
+                np.lib.format.open_memmap(os.path.join(directory, f"level_{k}_max.npy"), mode='w+', shape=(blocks, self.channels)))
+
+    def build_pyramid(self, directory, chunk_blocks=65536):
+        '''
+        Write the pyramid levels straight into memory mapped files, reading the records and each level in chunks.
+        '''
+        os.makedirs(directory, exist_ok=True)
+        blocks = -(-self.rows // self.factor)
+        level = self.open_level(directory, 1, blocks)
+        position = 0
+        carry = np.empty((0, 1 + self.channels))
+
+        #Level 1 in one streaming pass over the records, carrying a partial block over to the next chunk
+        for block in iter_records(self.run_dir, chunk_rows=self.factor * chunk_blocks):
+            block = np.concatenate((carry, block)) if len(carry) else block
+            whole = len(block) - len(block) % self.factor
+            carry = block[whole:]
+            grouped = block[:whole].reshape(-1, self.factor, 1 + self.channels)
+            level[0][position:position + len(grouped)] = grouped[:, 0, 0]
+            level[1][position:position + len(grouped)] = np.fmin.reduce(grouped[:, :, 1:], axis=1) #fmin/fmax skip NaN
+            level[2][position:position + len(grouped)] = np.fmax.reduce(grouped[:, :, 1:], axis=1)
+            position += len(grouped)
+
+        if len(carry):
+            level[0][position] = carry[0, 0]
+            level[1][position] = np.fmin.reduce(carry[:, 1:], axis=0)
+            level[2][position] = np.fmax.reduce(carry[:, 1:], axis=0)
+
+        k = 1
+        while blocks > PYRAMID_MIN_BLOCKS:
+            source = level
+            blocks = -(-blocks // self.factor)
+            k += 1
+            level = self.open_level(directory, k, blocks)
+            step = self.factor * chunk_blocks
+            for start in range(0, len(source[0]), step):
+                reduced = reduce_blocks(*(array[start:start + step] for array in source), self.factor)
+                for target, values in zip(level, reduced):
+                    target[start // self.factor:start // self.factor + len(values)] = values
+
+        for array in level:
+            array.flush()
+
+        while os.path.exists(os.path.join(directory, f"level_{k + 1}_time.npy")): #Levels left from a longer build
+            for name in ('time', 'min', 'max'):
+                os.remove(os.path.join(directory, f"level_{k + 1}_{name}.npy"))
+            k += 1
+
+    def time_range(self):
+        first = next(records for records in self.records if len(records))[0, 0]
+        last = next(records for records in reversed(self.records) if len(records))[-1, 0]
+        return float(first), float(last)
+
+    def raw_slices(self, t0, t1):
+        '''
+        (records, start, stop) per segment for the rows with t0 <= time <= t1, plus one on each side so lines reach
+        the view edges.
+        '''
+        slices = []
+        for records in self.records:
+            if not len(records) or records[-1, 0] < t0 or records[0, 0] > t1:
+                continue
+            column = records[:, 0]
+            start = max(int(np.searchsorted(column, t0)) - 1, 0)
+            stop = min(int(np.searchsorted(column, t1, side='right')) + 1, len(records))
+            slices.append((records, start, stop))
+        return slices
+
+    def level_slice(self, level, t0, t1):
+        times = self.levels[level - 1][0]
+        start = max(int(np.searchsorted(times, t0)) - 1, 0)
+        stop = min(int(np.searchsorted(times, t1, side='right')) + 1, len(times))
+        return start, stop
+
+    def window(self, t0, t1, max_points=4000):
+        '''
+        (level, times, values[channel]) for the span t0..t1 with at most about max_points points per channel.
+        Level 0 is the raw data; on coarser levels every block contributes its min and its max, in that order.
+        '''
+        level = 0
+        raw = self.raw_slices(t0, t1)
+
+        if sum(stop - start for _, start, stop in raw) > max_points:
+            for level in range(1, len(self.levels) + 1):
+                start, stop = self.level_slice(level, t0, t1)
+                if 2 * (stop - start) <= max_points:
+                    break
+
+        if level == 0:
+            pieces = [np.asarray(records[start:stop]) for records, start, stop in raw]
+            records = np.concatenate(pieces) if pieces else np.empty((0, 1 + self.channels))
+            return 0, records[:, 0], [records[:, 1 + channel] for channel in range(self.channels)]
+
+        times, minimums, maximums = self.levels[level - 1]
+
+        block_times = np.repeat(np.asarray(times[start:stop]), 2)
+        values = []
+        for channel in range(self.channels):
+            interleaved = np.empty(len(block_times))
+            interleaved[0::2] = minimums[start:stop, channel]
+            interleaved[1::2] = maximums[start:stop, channel]
+            values.append(interleaved)
+
+        return level, block_times, values
@@ -0,0 +1,176 @@
+'''
+Append-only recorder for readback streams.
+
+A run is a folder of segment files, segment_0000.bin, segment_0001.bin, ... Each segment is
+
+    b'DRBR', uint32 header length, JSON header (space padded to a multiple of 8 bytes)
+    records: little endian float64 rows [time_s, channel_0, ..., channel_n-1]
+
+The header lists the channel names and plot labels, the record layout and the run start time. Rows are fixed size
+and written in chunks, so a crash loses at most the chunk being buffered (flush_interval_s) and a partially written
+row, which the reader ignores. Segments rotate at max_segment_bytes so no single file grows without bound.
+'''
+import os
+import csv
+import json
+import time
+import struct
+import threading
+import numpy as np
+
+MAGIC = b'DRBR'
+PREFIX = struct.Struct('<4sI')
+RECORD_DTYPE = np.dtype('<f8')
+
+def segment_paths(run_dir):
+    return sorted(os.path.join(run_dir, name) for name in os.listdir(run_dir)
+                  if name.startswith('segment_') and name.endswith('.bin'))
+
+def read_header(path):
+    '''
+    Segment header and the byte offset of its first record.
+    '''
+    with open(path, 'rb') as f:
+        magic, length = PREFIX.unpack(f.read(PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a readback recording")
+        header = json.loads(f.read(length).decode('utf-8'))
+    return header, PREFIX.size + length
+
+def open_segment(path):
+    '''
+    Header and a read only memory map of a segment's records, shape (rows, 1 + channels). Nothing is loaded into RAM.
+    '''
+    header, offset = read_header(path)
+    columns = 1 + len(header['channels'])
+    rows = (os.path.getsize(path) - offset) // (columns * RECORD_DTYPE.itemsize) #Ignore a partially written last row
+
+    if rows == 0:
+        return header, np.empty((0, columns), dtype=RECORD_DTYPE)
+
+    return header, np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=offset, shape=(rows, columns))
+
+def iter_records(run_dir, chunk_rows=100000):
+    '''
+    Yield the run's records in blocks of at most chunk_rows rows, segment by segment.
+    '''
+    for path in segment_paths(run_dir):
+        _, records = open_segment(path)
+        for start in range(0, len(records), chunk_rows):
+            yield np.asarray(records[start:start + chunk_rows])
+
+def export_csv(run_dir, csv_path, chunk_rows=100000):
+    '''
+    Write a recorded run as CSV (Index, Time (s), one column per channel label), streaming it chunk by chunk.
+    '''
+    paths = segment_paths(run_dir)
+    if not paths:
+        raise ValueError(f"{run_dir} has no recorded segments")
+
+    header, _ = read_header(paths[0])
+    index = 0
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Index', 'Time (s)'] + header['labels'])
+        for block in iter_records(run_dir, chunk_rows):
+            for row in block.tolist():
+                writer.writerow([index] + row)
+                index += 1
+
+    return index
+
+class ReadbackRecorder:
+    '''
+    Streams timestamped samples to a run folder. append() takes time.monotonic() timestamps and may be called from
+    the acquisition thread; samples are buffered and written as one chunk every flush_interval_s (or chunk_rows
+    samples), and close() writes the rest. Recorded times are seconds since the recorder was created.
+    '''
+
+    def __init__(self, root_dir, channels, labels=None, max_segment_bytes=256 * 2**20, chunk_rows=4096, flush_interval_s=1.0):
+        self.channels = list(channels)
+        self.labels = list(labels) if labels is not None else [str(channel) for channel in self.channels]
+        self.max_segment_bytes = max_segment_bytes
+        self.chunk_rows = chunk_rows
+        self.flush_interval_s = flush_interval_s
+        self.row_bytes = (1 + len(self.channels)) * RECORD_DTYPE.itemsize
+
+        self.start_time = time.time()
+        self.start_monotonic = time.monotonic()
+        self.run_dir = os.path.join(root_dir, time.strftime('run_%Y%m%d_%H%M%S', time.localtime(self.start_time)))
+        suffix = 1
+        while os.path.exists(self.run_dir):
+            self.run_dir = os.path.join(root_dir, time.strftime('run_%Y%m%d_%H%M%S', time.localtime(self.start_time)) + f"_{suffix}")
+            suffix += 1
+        os.makedirs(self.run_dir)
+
+        self.lock = threading.Lock()
+        self.pending = []
+        self.last_flush = time.monotonic()
+        self.segment = -1
+        self.file = None
+        self.segment_bytes = 0
+        self.rows_written = 0
+        self.open_next_segment()
+
+    def header(self):
+        return {
+            "version": 1,
+            "channels": self.channels,
+            "labels": self.labels,
+            "record": ["time_s"] + self.channels,
+            "dtype": RECORD_DTYPE.str,
+            "start_unix": self.start_time,
+            "segment": self.segment
+        }
+
+    def open_next_segment(self):
+        if self.file is not None:
+            self.file.close()
+
+        self.segment += 1
+        header = json.dumps(self.header()).encode('utf-8')
+        header += b' ' * (-(PREFIX.size + len(header)) % 8) #Keep the records 8 byte aligned
+
+        self.file = open(os.path.join(self.run_dir, f"segment_{self.segment:04d}.bin"), 'wb')
+        self.file.write(PREFIX.pack(MAGIC, len(header)) + header)
+        self.file.flush()
+        self.segment_bytes = 0
+
+    def append(self, timestamp, values):
+        with self.lock:
+            self.pending.append(np.concatenate(([timestamp - self.start_monotonic], values)))
+            due = len(self.pending) >= self.chunk_rows or time.monotonic() - self.last_flush >= self.flush_interval_s
+            if due:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        self.last_flush = time.monotonic()
+        if not self.pending or self.file is None:
+            return
+
+        rows = np.vstack(self.pending).astype(RECORD_DTYPE)
+        self.pending = []
+
+        while len(rows):
+            if self.segment_bytes >= self.max_segment_bytes:
+                self.open_next_segment()
+            fit = max(1, (self.max_segment_bytes - self.segment_bytes) // self.row_bytes)
+            block, rows = rows[:fit], rows[fit:]
+            self.file.write(block.tobytes())
+            self.segment_bytes += block.nbytes
+            self.rows_written += len(block)
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
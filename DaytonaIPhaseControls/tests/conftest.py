@@ -0,0 +1,5 @@
+import os
+import sys
+
+#The packages (tt_engine, gui, ...) are imported from the DaytonaIPhaseControls folder, as the GUI does
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,39 @@
+import threading
+from ics_client.client import ChannelReadResult
+from ics_client.readback_cache import ReadbackCache
+
+class BlockingClient:
+    '''
+    Reads return the current value, the first one only once it is released.
+    '''
+
+    def __init__(self):
+        self.value = 1
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def read_channels(self, names, port=8001, **kwargs):
+        self.calls += 1
+        value = self.value
+        if self.calls == 1:
+            self.started.set()
+            self.release.wait(5)
+        result = ChannelReadResult()
+        result.values = {name: value for name in names}
+        return result
+
+def test_read_in_flight_during_invalidate_is_not_cached():
+    client = BlockingClient()
+    cache = ReadbackCache(client, max_age_s=60)
+    reader = threading.Thread(target=cache.read_channels, args=(["a", "b"],))
+    reader.start()
+    client.started.wait(5)
+
+    client.value = 2 #Written, then invalidated while the first read is still out
+    cache.invalidate(["a"])
+    client.release.set()
+    reader.join(5)
+
+    assert cache.read_channels(["a", "b"]).values == {"a": 2, "b": 1}
+    assert client.calls == 2
@@ -0,0 +1,50 @@
+import os
+import copy
+import json
+import numpy as np
+import pytest
+from tt_engine.tt_incremental import IncrementalTT
+from tt_engine.tt_compiler import compile_intent
+
+INTENT_JSON = os.path.join(os.path.dirname(__file__), '..', 'gui', 'intents', 'default_HDC_intent.json')
+
+def load_intent(**changes):
+    with open(INTENT_JSON, 'r') as f:
+        intent = json.load(f)
+    intent['HDCpath'] = 'Path A' #Single path builder, the one that encodes the ramps
+    intent.update(changes)
+    return intent
+
+def assert_same_tables(tables, expected):
+    assert tables.keys() == expected.keys()
+    for board_id, table in expected.items():
+        np.testing.assert_array_equal(tables[board_id], table)
+
+def test_update_matches_full_compile():
+    intent = load_intent()
+    tt_compiler = IncrementalTT()
+    assert_same_tables(tt_compiler.update(intent), compile_intent(intent))
+
+    edited = load_intent(trapAmp=intent['trapAmp'] + 1)
+    assert_same_tables(tt_compiler.update(edited), compile_intent(edited))
+    assert 'ramps' not in tt_compiler.rebuilt_phases
+
+def test_failed_update_leaves_no_stale_blocks():
+    '''
+    A phase that raises must not keep the blocks rebuilt before it for an intent that was never compiled.
+    '''
+    intent = load_intent()
+    failing = load_intent(fillAmp=77)
+    failing['pathA_traveling_wave_profile'] = copy.deepcopy(failing['pathA_traveling_wave_profile'])
+    failing['pathA_traveling_wave_profile']['ramps'][0]['state']['frequency'] = 0.5 #Period out of the 16 bit range
+    edited = load_intent(trapAmp=intent['trapAmp'] + 1)
+
+    tt_compiler = IncrementalTT()
+    tt_compiler.update(intent)
+    with pytest.raises(ValueError):
+        tt_compiler.update(failing)
+    tt_compiler.update(intent)
+
+    tables = tt_compiler.update(edited)
+    assert_same_tables(tables, compile_intent(edited))
+    assert 77.0 not in tables['6']['setpoint']
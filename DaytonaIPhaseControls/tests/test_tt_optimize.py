@@ -0,0 +1,22 @@
+import numpy as np
+from tt_engine.tt_dataclass import TT_DTYPE, opcodeCommand, OPCODE_VALUES
+from tt_engine.tt_optimize import optimize_table
+from tt_engine.address_resolver import get_resolver
+
+WRITE = OPCODE_VALUES[opcodeCommand.WRITE]
+END = OPCODE_VALUES[opcodeCommand.END]
+
+def test_same_tick_pulse_on_a_gate_is_kept():
+    gate = get_resolver().resolve("Digitizer Gate.DIO").address
+    other = get_resolver().resolve("Use SA220E.DIO").address
+    level = [channel.address for name, channel in get_resolver().channels.items()
+             if channel.board_id == 0 and channel.address not in (None, gate, other)][0]
+    table = np.array([(WRITE, 10, gate, 1.0), (WRITE, 0, gate, 0.0),
+                      (WRITE, 10, level, 1.0), (WRITE, 0, level, 2.0),
+                      (END, 0, 0, 0.0)], dtype=TT_DTYPE)
+
+    optimized, report = optimize_table(table, "0")
+
+    assert optimized['address'].tolist() == [gate, gate, level, 0]
+    assert optimized['setpoint'].tolist() == [1.0, 0.0, 2.0, 0.0]
+    assert report.coalesced == 1
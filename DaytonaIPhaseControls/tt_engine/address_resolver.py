@@ -0,0 +1,144 @@
+import os
+import csv
+import json
+import importlib
+from dataclasses import dataclass
+from scripts import fpga_map
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'gui', 'config')
+CANONICAL_NAMES_CSV = os.path.join(CONFIG_DIR, 'daytona_canonical_names.csv')
+PARAMETERS_JSON = os.path.join(CONFIG_DIR, 'daytona_gener8.parameters.json')
+
+#Board ID -> name of the register dictionary in scripts/fpga_map.py
+BOARD_REGISTER_MAPS = {
+    0: 'SC',  #Control board
+    4: 'TW',  #Path A TWAVE board
+    5: 'TW',  #Path B TWAVE board
+    6: 'TW',  #Path C/OBA TWAVE board
+    8: 'PC',  #PowerComm board
+    12: 'IO'  #IonOptics board
+}
+
+@dataclass(frozen=True)
+class ChannelAddress:
+    board_id: int | None
+    parameter: int | str | None
+    address: int | None #FPGA register offset, None if the parameter has no FPGA mapping
+
+    @property
+    def fpga_address(self) -> str | None:
+        '''
+        Address formatted the way it is written into the timing tables (upper case hex, no prefix).
+        '''
+        return None if self.address is None else format(self.address, 'x').upper()
+
+class AddressResolver:
+    '''
+    Canonical name -> (board, parameter, FPGA address) lookup table.
+
+    The table is compiled once from the canonical names CSV, scripts/fpga_map.py and the gener8 parameters JSON.
+    The canonical names CSV takes precedence, the parameters JSON only fills in names the CSV does not define.
+    Lookups are plain dictionary hits; call refresh() to pick up edits to any of the source files, the table is
+    only rebuilt when a source file's modification time has changed.
+    '''
+
+    def __init__(self, canonical_csv=CANONICAL_NAMES_CSV, parameters_json=PARAMETERS_JSON):
+        self.canonical_csv = canonical_csv
+        self.parameters_json = parameters_json
+        self.channels: dict[str, ChannelAddress] = {}
+        self._mtimes = None
+        self.refresh()
+
+    def source_files(self):
+        return [self.canonical_csv, self.parameters_json, fpga_map.__file__]
+
+    def refresh(self):
+        '''
+        Rebuild the lookup table if any of the source files changed since it was last built.
+        Returns True if the table was rebuilt.
+        '''
+        mtimes = [os.path.getmtime(path) if os.path.exists(path) else None for path in self.source_files()]
+
+        if mtimes == self._mtimes:
+            return False
+
+        if self._mtimes is not None and mtimes[2] != self._mtimes[2]:
+            importlib.reload(fpga_map)
+            mtimes = [os.path.getmtime(path) if os.path.exists(path) else None for path in self.source_files()]
+
+        self.channels = self._build_table()
+        self._mtimes = mtimes
+        return True
+
+    def _build_table(self):
+        channels = {}
+
+        with open(self.canonical_csv, newline='') as csvfile:
+            for row in csv.DictReader(csvfile):
+                name = row['Canonical Name']
+                if name in channels: #First definition wins, same as the original linear scan
+                    continue
+                board_id = int(row['Board ID'])
+                parameter = int(row['Parameter'])
+                channels[name] = ChannelAddress(board_id, parameter, self.register_lookup(board_id, parameter))
+
+        if os.path.exists(self.parameters_json):
+            with open(self.parameters_json, 'r') as f:
+                parameters = json.load(f)
+
+            for entry in parameters:
+                name = entry['canonical_name']
+                if name in channels:
+                    continue
+                board_id = entry['device']
+                parameter = entry['parameter']
+                channels[name] = ChannelAddress(board_id, parameter, self.register_lookup(board_id, parameter))
+
+        for register in fpga_map.TwaveAddresses:
+            channels[register.name] = ChannelAddress(None, None, int(register))
+
+        return channels
+
+    @staticmethod
+    def register_lookup(board_id, parameter):
+        '''
+        FPGA register offset for a board/parameter pair, None if there is no mapping.
+        '''
+        map_name = BOARD_REGISTER_MAPS.get(board_id)
+
+        if map_name is None or not isinstance(parameter, int):
+            return None
+
+        address = getattr(fpga_map, map_name).get(parameter)
+        return None if address is None else int(address)
+
+    def resolve(self, canonical_name) -> ChannelAddress | None:
+        '''
+        Resolve a canonical name (or a raw "0x..." register address) to its board, parameter and FPGA address.
+        Returns None if the name is unknown.
+        '''
+        channel = self.channels.get(canonical_name)
+
+        if channel is None and isinstance(canonical_name, str) and "0x" in canonical_name:
+            channel = ChannelAddress(None, None, int(canonical_name, 16))
+
+        return channel
+
+    def fpga_address(self, canonical_name) -> str | None:
+        channel = self.resolve(canonical_name)
+        return None if channel is None else channel.fpga_address
+
+_shared_resolver = None
+
+def get_resolver() -> AddressResolver:
+    '''
+    Process wide resolver built from the default config files. Checks the source files for changes on every call.
+    '''
+    global _shared_resolver
+
+    if _shared_resolver is None:
+        _shared_resolver = AddressResolver()
+    else:
+        _shared_resolver.refresh()
+
+    return _shared_resolver
@@ -1,20 +1,29 @@
 from tt_engine.tt_dataclass import Module, Step, opcodeCommand
 import numpy as np
-import struct
 from scripts.fpga_map import TwaveAddresses
+from tt_engine.twave_ramp import encode_ramp, expand_profile
 
 class DaytonaBase:
 
-    def get_tt_dictionary(self) -> dict[str, list[Step]]:
-        modules = [
+    def build(self):
+        '''
+        Run every phase of the timing table in order.
+        '''
+        for name, phase in self.phases():
+            phase()
+
+    def get_modules(self):
+        return [
             self.TWAVE_Module_PathA,
             self.TWAVE_Module_PathB,
             self.TWAVE_Module_PathC,
             self.CONTROL_Module
         ]
+
+    def get_tt_dictionary(self) -> dict[str, list[Step]]:
         return {
-            m.name: sorted(m.steps, key=lambda s: (s.abs_time_ms, s.priority))
-            for m in modules
+            m.name: m.sorted_steps()
+            for m in self.get_modules()
         }
 
     def get_tts(self):
@@ -68,13 +77,16 @@ class DaytonaBase:
         for key in twr_profiles:
             profile = self.intent.get(key)
 
+            if profile is not None:
+                profile = expand_profile(profile) #Fit curve defined ramps to linear segments
+
             if profile is not None and len(profile['ramps']) > 0 :
                 
                 twr_dict[key] = {
                     "ramp_profile": []
                 }
 
-                initial_step = self.intent[key]['initial_state']
+                initial_step = profile['initial_state']
 
                 twr_dict[key]['ramp_profile'].append({
                     "time_ms" : 0.0,
@@ -82,7 +94,7 @@ class DaytonaBase:
                     "amplitude" : initial_step['amplitude']
                 })
 
-                for ramp in self.intent[key]['ramps']:
+                for ramp in profile['ramps']:
                     twr_dict[key]['ramp_profile'].append({
                         "time_ms": ramp['time'],
                         "frequency": ramp['state']['frequency'],
@@ -124,76 +136,56 @@ class DaytonaBase:
                        'pathB_traveling_wave_profile' : [self.TWAVE_Module_PathB, "Path B Traveling Wave.amplitude", "Path B Traveling Wave.frequency"],
                        'pathC_traveling_wave_profile' : [self.TWAVE_Module_PathC, "Path C Traveling Wave.amplitude", "Path C Traveling Wave.frequency"]}
 
-        amplitude_hex_values = []
-        amplitude_float_values = []
-        frequency_float_values = []
-        frequency_hex_values = []
-        ramp_steps = []
-
-        for profile_key in profiles.keys():
-            for profile in range(0, len(profiles[profile_key]['ramp_profile'])):
-                if profile < len(profiles[profile_key]['ramp_profile']) - 1:
-                    ramp_start = list(profiles[profile_key]['ramp_profile'][profile].values())
-                    ramp_end = list(profiles[profile_key]['ramp_profile'][profile + 1].values())
-                    ramp_steps.insert(profile, ramp_start)
-                    delta_t_ticks_hex = hex((int(ramp_end[0] - ramp_start[0])) * 10)[2:].zfill(4)
-                    ramp_frequency_hex = hex(int((10**8)/(32*ramp_end[1])))[2:].zfill(4)
-                    ramp_amplitude_hex = hex(int(ramp_end[2]/100 * 4095))[2:].zfill(4)
-                    amplitude_hex_values.insert(profile,(ramp_amplitude_hex + delta_t_ticks_hex))
-                    frequency_hex_values.insert(profile,(ramp_frequency_hex + delta_t_ticks_hex))
-                    amplitude_float_values.insert(profile,(struct.unpack('>f', bytes.fromhex(ramp_amplitude_hex + delta_t_ticks_hex))[0]))
-                    frequency_float_values.insert(profile,(struct.unpack('>f', bytes.fromhex(ramp_frequency_hex + delta_t_ticks_hex))[0]))
+        ramp_addresses = [hex(TwaveAddresses.TWAVE_INITIAL_FREQUENCY_ADDRESS),
+                          hex(TwaveAddresses.TWAVE_INITIAL_AMPLITUDE_ADDRESS),
+                          hex(TwaveAddresses.TWAVE_RAMP_END_FREQUENCY),
+                          hex(TwaveAddresses.TWAVE_RAMP_END_AMPLITUDE)]
 
+        for profile_key, profile in profiles.items():
+            ramp_profile = profile['ramp_profile']
+            segments = encode_ramp([step['time_ms'] for step in ramp_profile],
+                                   [step['frequency'] for step in ramp_profile],
+                                   [step['amplitude'] for step in ramp_profile])
+
+            #Four writes per segment at the segment start time: initial frequency, initial amplitude, ramp frequency, ramplitude
             module = module_dict[profile_key][0]
-            for line, ramp in enumerate(ramp_steps):
-                    
-                    module.add_step(hex(TwaveAddresses.TWAVE_INITIAL_FREQUENCY_ADDRESS),
-                                    ramp[1], #Initial frequency
-                                    opcodeCommand.WRITE,
-                                    ramp[0]) #absolute time
-                    
-                    module.add_step(hex(TwaveAddresses.TWAVE_INITIAL_AMPLITUDE_ADDRESS),
-                                    ramp[2], #Initial amplitude
-                                    opcodeCommand.WRITE,
-                                    ramp[0]) #absolute time
-                    
-                    module.add_step(hex(TwaveAddresses.TWAVE_RAMP_END_FREQUENCY),
-                                    frequency_float_values[line], #Ramp Frequency
-                                    opcodeCommand.WRITE,
-                                    ramp[0]) #absolute time
-                    
-                    module.add_step(hex(TwaveAddresses.TWAVE_RAMP_END_AMPLITUDE),
-                                    amplitude_float_values[line], #Ramplitude
-                                    opcodeCommand.WRITE,
-                                    ramp[0]) #absolute time
-
-            print(f"Profile: {profile_key}, Amplitude Hex: {amplitude_hex_values}, Frequency Hex: {frequency_hex_values}, Amplitude Float: {amplitude_float_values}, Frequency Float: {frequency_float_values}, Ramp Steps: {ramp_steps}")
-    
-            amplitude_hex_values.clear()
-            amplitude_float_values.clear()
-            frequency_float_values.clear()
-            frequency_hex_values.clear()
-            ramp_steps.clear()
+            module.add_steps(ramp_addresses * len(segments),
+                             np.column_stack([segments.start_frequency,
+                                              segments.start_amplitude,
+                                              segments.frequency_values,
+                                              segments.amplitude_values]).ravel(),
+                             opcodeCommand.WRITE,
+                             np.repeat(segments.start_time_ms, len(ramp_addresses)))
 
 class Daytona_HDC_tt(DaytonaBase):
 
-    def __init__(self, intent=None):
-        self.TWAVE_Module_PathA = Module("4")
-        self.TWAVE_Module_PathB = Module("5")
-        self.TWAVE_Module_PathC = Module("6")
-        self.CONTROL_Module = Module("0")
+    def __init__(self, intent=None, module_cls=Module, build=True):
+        self.reset_modules(module_cls)
         self.intent = intent
 
+        if build:
+            self.build()
+
+    def reset_modules(self, module_cls=Module):
+        self.TWAVE_Module_PathA = module_cls("4")
+        self.TWAVE_Module_PathB = module_cls("5")
+        self.TWAVE_Module_PathC = module_cls("6")
+        self.CONTROL_Module = module_cls("0")
+
+    def phases(self):
+
         #Timing Table Saugage Maker
 
-        self.init_steps(abs_time_ms=0.0)
-        self.fill(abs_time_ms=self.intent['release'])
-        self.trap(abs_time_ms=self.intent['release'] + self.intent['fill'])
-        self.release(abs_time_ms=0.0) #i know, its confusing, but we start with release
-        self.stall(abs_time_ms=self.intent['sipPeriod'] - self.intent['stallDuration'])
-        self.flush(SIP_period=self.intent['sipPeriod'])
-        self.wait(SIP_period=self.intent['sipPeriod'])
-        self.build_twrs(SIP_period=self.intent['sipPeriod'])
+        return [
+            ('init_steps', lambda: self.init_steps(abs_time_ms=0.0)),
+            ('fill', lambda: self.fill(abs_time_ms=self.intent['release'])),
+            ('trap', lambda: self.trap(abs_time_ms=self.intent['release'] + self.intent['fill'])),
+            ('release', lambda: self.release(abs_time_ms=0.0)), #i know, its confusing, but we start with release
+            ('stall', lambda: self.stall(abs_time_ms=self.intent['sipPeriod'] - self.intent['stallDuration'])),
+            ('flush', lambda: self.flush(SIP_period=self.intent['sipPeriod'])),
+            ('wait', lambda: self.wait(SIP_period=self.intent['sipPeriod'])),
+            ('ramps', lambda: self.build_twrs(SIP_period=self.intent['sipPeriod']))
+        ]
 
     def init_steps(self, abs_time_ms):
         '''
@@ -455,13 +447,13 @@ class Daytona_HDC_tt(DaytonaBase):
                                          SIP_period + (SIP_period - self.intent['stallDuration']),
                                          priority=2)
 
-        self.TWAVE_Module_PathC.add_step("TWC_NO_OP",                                        
+        self.TWAVE_Module_PathC.add_step("TW3_NO_OP",                                        
                                          0.0,
                                          opcodeCommand.WAIT, #WAIT_4_READY for Path B Flush.
                                          self.intent['release'] + self.intent['fill'],
                                          priority=2)
         
-        self.TWAVE_Module_PathC.add_step("TWC_NO_OP",                                        
+        self.TWAVE_Module_PathC.add_step("TW3_NO_OP",                                        
                                          0.0,
                                          opcodeCommand.WAIT, #WAIT_4_READY for Path B Flush.
                                          self.intent['release'] + self.intent['fill'] + self.intent['trap'] 
@@ -476,8 +468,8 @@ class Daytona_HDC_tt(DaytonaBase):
             twr_dict[key] = {
                 "ramp_profile": []
             }
-            print(self.intent[key]['ramps'])
-            for ramp in self.intent[key]['ramps']:
+            ramps = expand_profile(self.intent[key])['ramps']
+            for ramp in ramps:
                 twr_dict[key]['ramp_profile'].append({
                     "time_ms": ramp['time'],
                     "frequency": ramp['state']['frequency'],
@@ -498,35 +490,48 @@ class Daytona_HDC_tt(DaytonaBase):
 
 class Daytona_SinglePath_tt(DaytonaBase):
 
-    def __init__(self, intent=None):
-
-        self.TWAVE_Module_PathA = Module("4")
-        self.TWAVE_Module_PathB = Module("5")
-        self.TWAVE_Module_PathC = Module("6")
-        self.CONTROL_Module = Module("0")
+    def __init__(self, intent=None, module_cls=Module, build=True):
+        self.reset_modules(module_cls)
         self.intent = intent
 
+        if build:
+            self.build()
+
+    def reset_modules(self, module_cls=Module):
+        self.TWAVE_Module_PathA = module_cls("4")
+        self.TWAVE_Module_PathB = module_cls("5")
+        self.TWAVE_Module_PathC = module_cls("6")
+        self.CONTROL_Module = module_cls("0")
+
         self.pathSelection_dict = {
             'Path A' : [self.TWAVE_Module_PathA, 'Path A Gate.control', 'Path A Dynamic Guard.setpoint', 'TW1_NO_OP'], #Gate mapping based on user path selection
             'Path B' : [self.TWAVE_Module_PathB, 'Path B Gate.control', 'Path A Dynamic Guard.setpoint', 'TW2_NO_OP']
         }
 
+    def phases(self):
+
         #Timing Table Saugage Maker
 
-        sep_dt, oba_dt = self.dead_time_calc() #find the dead time to be used to accumulate ions in parallel with separation.
-        idle_module = self.TWAVE_Module_PathA if self.intent['HDCpath'] == 'Path B' else self.TWAVE_Module_PathB
+        return [
+            ('init_steps', lambda: self.init_steps(abs_time_ms=0.0)),
+            ('fill', lambda: self.fill(abs_time_ms=self.intent['release'] + self.dead_time_calc()[1])),
+            ('trap', lambda: self.trap(abs_time_ms=self.intent['release'] + self.intent['fill'] + self.dead_time_calc()[1])),
+            ('release', lambda: self.release(abs_time_ms=0.0)),
+            ('flush', lambda: self.flush(abs_time_ms=self.intent['sipPeriod'] + self.dead_time_calc()[0] - self.intent['flushDuration'])),
+            ('loop', lambda: self.loop(abs_time_ms=self.intent['sipPeriod'])),
+            ('end', lambda: self.end(abs_time_ms=self.intent['sipPeriod'], idle_twave_module = self.idle_module())),
+            ('ramps', self.build_ramps)
+        ]
 
-        self.init_steps(abs_time_ms=0.0)
-        self.fill(abs_time_ms=self.intent['release'] + oba_dt)
-        self.trap(abs_time_ms=self.intent['release'] + self.intent['fill'] + oba_dt)
-        self.release(abs_time_ms=0.0)
-        self.flush(abs_time_ms=self.intent['sipPeriod'] + sep_dt - self.intent['flushDuration'])
-        self.loop(abs_time_ms=self.intent['sipPeriod'])
-        self.end(abs_time_ms=self.intent['sipPeriod'], idle_twave_module = idle_module)
+    def idle_module(self):
+        return self.TWAVE_Module_PathA if self.intent['HDCpath'] == 'Path B' else self.TWAVE_Module_PathB
 
+    def build_ramps(self):
         if any([
             self.intent.get('pathA_traveling_wave_profile', {}).get('ramps'),
-            self.intent.get('pathB_traveling_wave_profile', {}).get('ramps')
+            self.intent.get('pathB_traveling_wave_profile', {}).get('ramps'),
+            self.intent.get('pathA_traveling_wave_profile', {}).get('curve'),
+            self.intent.get('pathB_traveling_wave_profile', {}).get('curve')
         ]):
             self.build_profiles()
 
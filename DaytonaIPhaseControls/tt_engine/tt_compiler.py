@@ -0,0 +1,72 @@
+import numpy as np
+from functools import partial
+from tt_engine.tt_dataclass import ColumnarModule, opcodeCommand, UNRESOLVED_ADDRESS, OPCODES_BY_VALUE
+from tt_engine.tt_builder import Daytona_HDC_tt, Daytona_SinglePath_tt
+from tt_engine.address_resolver import get_resolver
+from tt_engine.tt_optimize import optimize_tables
+
+def select_builder(intent):
+    '''
+    Timing table builder class for the intent's HDC path selection.
+    '''
+    return Daytona_HDC_tt if intent['HDCpath'] == 'Both' else Daytona_SinglePath_tt
+
+def build_tt(intent, resolver=None):
+    '''
+    Build the timing table steps for an intent on the array backed ColumnarModule.
+    '''
+    return select_builder(intent)(intent=intent, module_cls=partial(ColumnarModule, resolver=resolver or get_resolver()))
+
+def compile_intent(intent, resolver=None, optimize=False) -> dict[str, np.ndarray]:
+    '''
+    Compile an intent dictionary into encoded timing tables keyed by board ID ("4", "5", "6", "0").
+    With optimize, redundant writes are removed (see tt_optimize).
+    Does not depend on Qt, safe to call from scripts and worker processes.
+    '''
+    return compile_tables(intent, resolver, optimize)[0]
+
+def compile_tables(intent, resolver=None, optimize=False):
+    '''
+    compile_intent() that also returns the canonical names without an FPGA address, as {board_id: [names]} for the
+    boards that have any. Those lines are encoded with UNRESOLVED_ADDRESS.
+    '''
+    modules = build_tt(intent, resolver).get_modules()
+    tt_tables = {module.name: module.encode() for module in modules}
+    unresolved = {module.name: module.unresolved for module in modules if module.unresolved}
+
+    if optimize:
+        tt_tables, _ = optimize_tables(tt_tables, resolver)
+
+    return tt_tables, unresolved
+
+def unresolved_message(unresolved):
+    '''
+    One line per board listing its canonical names without an FPGA address, as printed after a compile.
+    '''
+    return "\n".join(f"Board {board_id}: no FPGA address found for {', '.join(names)}"
+                     for board_id, names in unresolved.items())
+
+def format_address(opcode, address):
+    '''
+    Address as shown in the output CSV: the target line for LOOP, upper case hex otherwise, None if unresolved.
+    '''
+    if opcode == opcodeCommand.LOOP:
+        return address
+    return None if address == UNRESOLVED_ADDRESS else format(address, 'x').upper()
+
+def table_rows(table):
+    '''
+    Display form of an encoded table: one dict per line with the opcode and address formatted as in the output CSV.
+    '''
+    rows = []
+
+    for opcode, ticks, address, setpoint in table.tolist():
+        opcode = OPCODES_BY_VALUE[opcode]
+        rows.append({
+            "opcode": opcode.value,
+            "ticks": ticks,
+            "address": format_address(opcode, address),
+            "setpoint": setpoint
+        })
+
+    return rows
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from enum import Enum
+import numpy as np
 
 class opcodeCommand(Enum):
     WRITE = '0' #0x0000, Wait then Execute write value to address
@@ -23,4 +24,192 @@ class Module:
     def add_step(self, canonical_name: str, setpoint: float, opcode: opcodeCommand, abs_time_ms: float, priority: int = 0):
         step = Step(canonical_name, setpoint, opcode, abs_time_ms, priority)
         self.steps.append(step)
-    
\ No newline at end of file
+
+    def add_steps(self, canonical_names, setpoints, opcode: opcodeCommand, abs_times_ms, priority: int = 0):
+        count = len(setpoints)
+        canonical_names = [canonical_names] * count if isinstance(canonical_names, str) else list(canonical_names)
+        abs_times_ms = list(np.broadcast_to(abs_times_ms, (count,)))
+        for canonical_name, setpoint, abs_time_ms in zip(canonical_names, setpoints, abs_times_ms):
+            self.add_step(canonical_name, float(setpoint), opcode, float(abs_time_ms), priority)
+
+    def sorted_steps(self) -> list[Step]:
+        return sorted(self.steps, key=lambda s: (s.abs_time_ms, s.priority))
+
+#One encoded timing table line. Address is the FPGA register (or the line number for LOOP), -1 when unresolved.
+TT_DTYPE = np.dtype([
+    ('opcode', np.uint8),
+    ('ticks', np.int64),
+    ('address', np.int32),
+    ('setpoint', np.float64)
+])
+
+UNRESOLVED_ADDRESS = -1
+
+OPCODE_VALUES = {opcode: int(opcode.value, 16) for opcode in opcodeCommand}
+OPCODES_BY_VALUE = {value: opcode for opcode, value in OPCODE_VALUES.items()}
+
+class ColumnarModule:
+    '''
+    Array backed drop in for Module.
+
+    Steps are stored in growable NumPy columns (time, priority, opcode, address, setpoint) instead of one Step
+    object per line. Canonical names are interned and resolved to an FPGA address once per name.
+    '''
+
+    def __init__(self, name: str, resolver=None, capacity: int = 64):
+        self.name = name
+        self.resolver = resolver
+        self.size = 0
+        self.abs_time_ms = np.empty(capacity, dtype=np.float64)
+        self.priority = np.empty(capacity, dtype=np.int16)
+        self.opcode = np.empty(capacity, dtype=np.uint8)
+        self.address = np.empty(capacity, dtype=np.int32)
+        self.setpoint = np.empty(capacity, dtype=np.float64)
+        self.name_id = np.empty(capacity, dtype=np.int32)
+        self.names = []
+        self._name_keys = []
+        self._name_ids = {}
+        self._addresses = []
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, count):
+        required = self.size + count
+        capacity = len(self.abs_time_ms)
+
+        if required <= capacity:
+            return
+
+        while capacity < required:
+            capacity *= 2
+
+        for column in ('abs_time_ms', 'priority', 'opcode', 'address', 'setpoint', 'name_id'):
+            old = getattr(self, column)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, column, new)
+
+    def _intern(self, canonical_name, opcode: opcodeCommand):
+        key = (canonical_name, opcode == opcodeCommand.LOOP)
+        name_id = self._name_ids.get(key)
+
+        if name_id is None:
+            if opcode == opcodeCommand.LOOP:
+                address = int(canonical_name) #LOOP jumps to a line number
+            else:
+                if self.resolver is None:
+                    from tt_engine.address_resolver import get_resolver
+                    self.resolver = get_resolver()
+                channel = self.resolver.resolve(canonical_name)
+                address = UNRESOLVED_ADDRESS if channel is None or channel.address is None else channel.address
+            name_id = self._add_name(key, address)
+
+        return name_id
+
+    @property
+    def unresolved(self) -> list[str]:
+        '''
+        Canonical names used by this module that have no FPGA address, each once.
+        '''
+        return [key[0] for key, address in zip(self._name_keys, self._addresses)
+                if not key[1] and address == UNRESOLVED_ADDRESS]
+
+    def _add_name(self, key, address):
+        name_id = len(self.names)
+        self.names.append(key[0])
+        self._name_keys.append(key)
+        self._addresses.append(address)
+        self._name_ids[key] = name_id
+        return name_id
+
+    def add_step(self, canonical_name: str, setpoint: float, opcode: opcodeCommand, abs_time_ms: float, priority: int = 0):
+        self._reserve(1)
+        name_id = self._intern(canonical_name, opcode)
+        i = self.size
+        self.abs_time_ms[i] = abs_time_ms
+        self.priority[i] = priority
+        self.opcode[i] = OPCODE_VALUES[opcode]
+        self.address[i] = self._addresses[name_id]
+        self.setpoint[i] = setpoint
+        self.name_id[i] = name_id
+        self.size += 1
+
+    def add_steps(self, canonical_names, setpoints, opcode: opcodeCommand, abs_times_ms, priority: int = 0):
+        '''
+        Append one step per element of setpoints. canonical_names and abs_times_ms are either one value for all
+        steps or one value per step.
+        '''
+        setpoints = np.asarray(setpoints, dtype=np.float64)
+        count = len(setpoints)
+        abs_times_ms = np.broadcast_to(np.asarray(abs_times_ms, dtype=np.float64), setpoints.shape)
+
+        if isinstance(canonical_names, str):
+            name_ids = self._intern(canonical_names, opcode)
+        else:
+            unique_names, inverse = np.unique(np.asarray(canonical_names), return_inverse=True)
+            name_ids = np.array([self._intern(name, opcode) for name in unique_names.tolist()], dtype=np.int32)[inverse]
+
+        self._reserve(count)
+        block = slice(self.size, self.size + count)
+        self.abs_time_ms[block] = abs_times_ms
+        self.priority[block] = priority
+        self.opcode[block] = OPCODE_VALUES[opcode]
+        self.address[block] = np.asarray(self._addresses, dtype=np.int32)[name_ids]
+        self.setpoint[block] = setpoints
+        self.name_id[block] = name_ids
+        self.size += count
+
+    def extend(self, other: 'ColumnarModule'):
+        '''
+        Append all steps of another ColumnarModule, keeping their insertion order.
+        '''
+        remap = np.empty(len(other.names), dtype=np.int32)
+        for other_id, key in enumerate(other._name_keys):
+            name_id = self._name_ids.get(key)
+            remap[other_id] = self._add_name(key, other._addresses[other_id]) if name_id is None else name_id
+
+        self._reserve(other.size)
+        block = slice(self.size, self.size + other.size)
+        for column in ('abs_time_ms', 'priority', 'opcode', 'address', 'setpoint'):
+            getattr(self, column)[block] = getattr(other, column)[:other.size]
+        self.name_id[block] = remap[other.name_id[:other.size]]
+        self.size += other.size
+
+    def sort_order(self) -> np.ndarray:
+        '''
+        Stable order of the steps by (abs_time_ms, priority), ties keep insertion order like sorted() does for Module.
+        '''
+        return np.lexsort((self.priority[:self.size], self.abs_time_ms[:self.size]))
+
+    def _step(self, i) -> Step:
+        return Step(self.names[self.name_id[i]], float(self.setpoint[i]), OPCODES_BY_VALUE[int(self.opcode[i])],
+                    float(self.abs_time_ms[i]), int(self.priority[i]))
+
+    @property
+    def steps(self) -> list[Step]:
+        return [self._step(i) for i in range(self.size)]
+
+    def sorted_steps(self) -> list[Step]:
+        return [self._step(i) for i in self.sort_order()]
+
+    def tick_deltas(self, order=None) -> np.ndarray:
+        '''
+        Delay of each sorted line from the previous one in 0.1 ms clock ticks.
+        '''
+        order = self.sort_order() if order is None else order
+        times = self.abs_time_ms[order]
+        previous = np.concatenate(([0.0], times[:-1]))
+        return np.round((np.round(times, 1) - previous) * 10.0).astype(np.int64)
+
+    def encode(self) -> np.ndarray:
+        '''
+        Sorted, encoded timing table for this board as a TT_DTYPE array.
+        '''
+        order = self.sort_order()
+        table = np.empty(self.size, dtype=TT_DTYPE)
+        table['opcode'] = self.opcode[order]
+        table['ticks'] = self.tick_deltas(order)
+        table['address'] = self.address[order]
+        table['setpoint'] = self.setpoint[order]
+        return table
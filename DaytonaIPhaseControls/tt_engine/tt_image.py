@@ -0,0 +1,73 @@
+'''
+Timing table export from the compiled per-board arrays.
+
+export_table() writes the table CSV and converts it with scripts/convert_csv.exe, passing duration_ticks() of the
+array, the same way the popup always has. Lines without an FPGA address are written as "None", as before, and are
+left for the converter to handle.
+
+The binary image layout is defined by convert_csv.exe alone. There is no in process encoder: one can only be added
+once the layout is taken from real converter output and checked byte for byte against it.
+'''
+import os
+import csv
+import json
+import argparse
+import subprocess
+from tt_engine.tt_compiler import compile_tables, unresolved_message, table_rows
+
+CONVERT_CSV_EXE = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'convert_csv.exe')
+
+def duration_ticks(table):
+    return int(table['ticks'].sum())
+
+def write_tt_csv(table, file_path):
+    '''
+    Write a compiled table in the CSV format fed to convert_csv.exe: line, opcode, ticks, address, value.
+    '''
+    with open(file_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        for line, row in enumerate(table_rows(table)):
+            writer.writerow([str(line)] + [str(value) for value in row.values()])
+
+def run_converter(csv_path, board_id, duration, exe_path=CONVERT_CSV_EXE):
+    '''
+    Run convert_csv.exe on a table CSV. Raises subprocess.CalledProcessError if the exe fails, OSError if it can not
+    be started.
+    '''
+    subprocess.run([
+        exe_path,
+        "--duration_ticks", str(duration),
+        "--board_id", str(board_id),
+        "--csv_file", str(csv_path)
+    ], check=True)
+
+def export_table(table, board_id, csv_path, exe_path=CONVERT_CSV_EXE):
+    '''
+    Export one board: write its CSV to csv_path and convert it with convert_csv.exe.
+    '''
+    write_tt_csv(table, csv_path)
+    run_converter(csv_path, board_id, duration_ticks(table), exe_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile an intent JSON and export the per-board timing tables.")
+    parser.add_argument("intent", help="Intent JSON file")
+    parser.add_argument("output_dir", help="Folder for the board_<id>.csv tables, converted next to them")
+    parser.add_argument("--exe", default=CONVERT_CSV_EXE, help="Path to convert_csv.exe")
+    args = parser.parse_args()
+
+    with open(args.intent, 'r') as f:
+        tt_tables, unresolved = compile_tables(json.load(f))
+
+    if unresolved:
+        print(unresolved_message(unresolved))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for board_id, table in tt_tables.items():
+        try:
+            export_table(table, board_id, os.path.join(args.output_dir, f"board_{board_id}.csv"), args.exe)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Board {board_id}: export failed: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import copy
+from functools import partial
+from dataclasses import dataclass
+import numpy as np
+from tt_engine.tt_dataclass import ColumnarModule
+from tt_engine.tt_compiler import select_builder
+from tt_engine.address_resolver import get_resolver
+from tt_engine.tt_optimize import optimize_table
+
+_MISSING = object()
+
+class TrackedIntent(dict):
+    '''
+    Intent dictionary that records which top level keys a phase reads.
+    '''
+
+    def __init__(self, intent):
+        super().__init__(intent)
+        self.keys_read = set()
+
+    def __getitem__(self, key):
+        self.keys_read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.keys_read.add(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self.keys_read.add(key)
+        return super().__contains__(key)
+
+@dataclass
+class PhaseBlock:
+    keys_read: set
+    modules: dict[str, ColumnarModule] #Steps the phase added, by board ID
+
+class IncrementalTT:
+    '''
+    Memoized timing table compiler for live editing of an intent.
+
+    Each builder phase (init_steps, fill, trap, ...) is run against its own empty modules while the intent keys it
+    reads are recorded. On the next update only the phases whose keys changed are run again; the cached step blocks
+    are then merged back in phase order, which gives the same tables as a full compile_intent().
+    With optimize, each merged table goes through the redundant write elimination and its report is kept in reports.
+    The canonical names without an FPGA address are kept per board in unresolved. An update that raises leaves the
+    cached blocks as they were, so a bad intent typed in the preview can not leak into later tables.
+    '''
+
+    def __init__(self, resolver=None, optimize=False):
+        self.resolver = resolver
+        self.optimize = optimize
+        self.reports = {}
+        self.unresolved: dict[str, list[str]] = {}
+        self.builder_cls = None
+        self.intent = None
+        self.channels = None
+        self.blocks: dict[str, PhaseBlock] = {}
+        self.phase_order = []
+        self.tables: dict[str, np.ndarray] = {}
+        self.rebuilt_phases = []
+
+    def invalidate(self):
+        self.builder_cls = None
+        self.blocks.clear()
+        self.tables.clear()
+        self.reports.clear()
+        self.unresolved.clear()
+
+    def update(self, intent) -> dict[str, np.ndarray]:
+        '''
+        Compile the intent, rebuilding only the phases affected by changes since the last update.
+        '''
+        resolver = self.resolver or get_resolver()
+        builder_cls = select_builder(intent)
+
+        if builder_cls is not self.builder_cls or resolver.channels is not self.channels: #Different phases or addresses
+            self.invalidate()
+            self.builder_cls = builder_cls
+            self.channels = resolver.channels
+
+        module_cls = partial(ColumnarModule, resolver=resolver)
+        tt = builder_cls(intent=None, module_cls=module_cls, build=False)
+        phases = tt.phases()
+        self.phase_order = [name for name, phase in phases]
+        self.rebuilt_phases = []
+        rebuilt = {} #Kept aside until every phase succeeded, so a failing intent leaves the cache untouched
+        changed_boards = set()
+
+        for name, phase in phases:
+            block = self.blocks.get(name)
+
+            if block is not None and not self.inputs_changed(block.keys_read, intent):
+                continue
+
+            tracked_intent = TrackedIntent(intent)
+            tt.intent = tracked_intent
+            tt.reset_modules(module_cls)
+            phase()
+
+            modules = {module.name: module for module in tt.get_modules()}
+            for board_id, module in modules.items():
+                if len(module) or (block is not None and len(block.modules[board_id])):
+                    changed_boards.add(board_id)
+
+            rebuilt[name] = PhaseBlock(tracked_intent.keys_read, modules)
+
+        self.blocks.update(rebuilt)
+        self.rebuilt_phases = list(rebuilt)
+        self.intent = copy.deepcopy(intent)
+
+        try:
+            for board_id in self.blocks[self.phase_order[0]].modules:
+                if board_id in changed_boards or board_id not in self.tables:
+                    self.tables[board_id] = self.merge(board_id, resolver)
+        except Exception:
+            self.invalidate() #Blocks and tables would disagree, start over on the next update
+            raise
+
+        return dict(self.tables)
+
+    def inputs_changed(self, keys, intent):
+        return any(intent.get(key, _MISSING) != self.intent.get(key, _MISSING) for key in keys)
+
+    def merge(self, board_id, resolver=None):
+        merged = ColumnarModule(board_id, resolver=resolver)
+        for name in self.phase_order:
+            merged.extend(self.blocks[name].modules[board_id])
+
+        table = merged.encode()
+        if merged.unresolved:
+            self.unresolved[board_id] = merged.unresolved
+        else:
+            self.unresolved.pop(board_id, None)
+        if self.optimize:
+            table, self.reports[board_id] = optimize_table(table, board_id, resolver)
+        return table
@@ -0,0 +1,193 @@
+'''
+Redundant write elimination for compiled timing tables.
+
+Two passes over each board's TT_DTYPE table:
+    - coalesce: a write followed, at the same tick, by another write to the same register is dropped. Gate, DIO and
+      trigger registers are not coalesced: two writes at the same tick (1 then 0) are a pulse on the edge.
+    - redundant: a write of the value the register is known to hold on every path into the line is dropped. Register
+      state is tracked per resolved address through the table's control flow, LOOP back edges included, until it
+      reaches a fixpoint.
+
+The T-wave ramp registers are never dropped (the ramp engine changes the live frequency and amplitude, and writing
+a ramp end register starts a ramp), nor are lines without an FPGA address. Removed delays are carried by the next
+remaining line and LOOP targets are renumbered, so every remaining line still executes at the same tick.
+'''
+import re
+from dataclasses import dataclass
+import numpy as np
+from scripts.fpga_map import TwaveAddresses
+from tt_engine.tt_dataclass import opcodeCommand, OPCODE_VALUES, UNRESOLVED_ADDRESS
+from tt_engine.address_resolver import get_resolver
+
+WRITE = OPCODE_VALUES[opcodeCommand.WRITE]
+LOOP = OPCODE_VALUES[opcodeCommand.LOOP]
+END = OPCODE_VALUES[opcodeCommand.END]
+
+TWAVE_BOARDS = ("4", "5", "6")
+EDGE_TRIGGERED_NAME = re.compile(r'gate|\bdio\b|trig', re.IGNORECASE) #Canonical names of edge triggered registers
+
+@dataclass
+class OptimizationReport:
+    board_id: str
+    lines_before: int
+    lines_after: int
+    coalesced: int
+    redundant: int
+
+    @property
+    def lines_saved(self):
+        return self.lines_before - self.lines_after
+
+    def __str__(self):
+        return (f"Board {self.board_id}: {self.lines_before} -> {self.lines_after} lines "
+                f"({self.coalesced} coalesced, {self.redundant} redundant)")
+
+def volatile_addresses(board_id):
+    '''
+    Registers whose writes always have an effect on this board.
+    '''
+    if str(board_id) in TWAVE_BOARDS:
+        return {UNRESOLVED_ADDRESS} | {int(register) for register in TwaveAddresses}
+    return {UNRESOLVED_ADDRESS}
+
+def edge_triggered_addresses(board_id, resolver=None):
+    '''
+    Gate, DIO and trigger registers of this board, found by canonical name.
+    '''
+    resolver = resolver or get_resolver()
+    return {channel.address for name, channel in resolver.channels.items()
+            if channel.board_id is not None and str(channel.board_id) == str(board_id)
+            and channel.address is not None and EDGE_TRIGGERED_NAME.search(name)}
+
+def successors(table, line):
+    opcode = table['opcode'][line]
+    if opcode == END:
+        return []
+    if opcode == LOOP and table['setpoint'][line] > 0:
+        return [line + 1, int(table['address'][line])]
+    return [line + 1]
+
+def register_states(table, volatile):
+    '''
+    Known register values on entry to every line, as {address: value}. None for lines that are never reached.
+    '''
+    states = [None] * len(table)
+    if not len(table):
+        return states
+
+    states[0] = {}
+    worklist = [0]
+    opcodes = table['opcode'].tolist()
+    addresses = table['address'].tolist()
+    values = table['setpoint'].tolist()
+
+    while worklist:
+        line = worklist.pop()
+        state = states[line]
+
+        if opcodes[line] == WRITE:
+            state = dict(state)
+            if addresses[line] in volatile:
+                state.pop(addresses[line], None)
+            else:
+                state[addresses[line]] = values[line]
+
+        for successor in successors(table, line):
+            if successor >= len(table):
+                continue
+
+            current = states[successor]
+            if current is None:
+                merged = state
+            else:
+                merged = {address: value for address, value in current.items() if state.get(address) == value}
+                if len(merged) == len(current):
+                    continue
+
+            states[successor] = merged
+            worklist.append(successor)
+
+    return states
+
+def coalesced_writes(table, volatile):
+    '''
+    Writes overwritten at the same tick by a later write to the same register.
+    '''
+    drop = np.zeros(len(table), dtype=bool)
+    run = {} #address -> line of its last write in the current same tick run of writes
+
+    for line, (opcode, ticks, address, _) in enumerate(table.tolist()):
+        if opcode != WRITE or ticks != 0:
+            run = {}
+        if opcode != WRITE:
+            continue
+        if address in run:
+            drop[run[address]] = True
+        if address not in volatile:
+            run[address] = line
+
+    return drop
+
+def redundant_writes(table, volatile):
+    states = register_states(table, volatile)
+    drop = np.zeros(len(table), dtype=bool)
+
+    for line, (opcode, _, address, value) in enumerate(table.tolist()):
+        state = states[line]
+        if opcode == WRITE and state is not None and address not in volatile and state.get(address, np.nan) == value:
+            drop[line] = True
+
+    return drop
+
+def remove_lines(table, drop):
+    '''
+    Table without the dropped lines. Each dropped line's delay moves to the next remaining line; a dropped line with a
+    delay is kept when a LOOP target lies between it and that line, as the jump would otherwise pick up its delay.
+    '''
+    drop = drop.copy()
+    drop[-1:] = False #The last line carries the end of the table
+    targets = np.sort(table['address'][table['opcode'] == LOOP])
+
+    while True:
+        kept = np.flatnonzero(~drop)
+        next_kept = kept[np.searchsorted(kept, np.arange(len(table)))]
+        dropped = np.flatnonzero(drop & (table['ticks'] != 0))
+        spans_target = np.searchsorted(targets, dropped, side='right') < np.searchsorted(targets, next_kept[dropped], side='right')
+        if not spans_target.any():
+            break
+        drop[dropped[spans_target]] = False
+
+    ticks = np.zeros(len(table), dtype=np.int64)
+    np.add.at(ticks, next_kept, table['ticks'])
+
+    optimized = table[kept].copy()
+    optimized['ticks'] = ticks[kept]
+    is_loop = optimized['opcode'] == LOOP
+    optimized['address'][is_loop] = np.searchsorted(kept, optimized['address'][is_loop])
+    return optimized
+
+def optimize_table(table, board_id, resolver=None):
+    '''
+    Drop the coalescable and redundant writes from one board's table. Returns the new table and its report.
+    '''
+    volatile = volatile_addresses(board_id)
+    lines_before = len(table)
+
+    if not lines_before:
+        return table, OptimizationReport(str(board_id), 0, 0, 0, 0)
+
+    table = remove_lines(table, coalesced_writes(table, volatile | edge_triggered_addresses(board_id, resolver)))
+    coalesced = lines_before - len(table)
+    table = remove_lines(table, redundant_writes(table, volatile))
+
+    return table, OptimizationReport(str(board_id), lines_before, len(table), coalesced, lines_before - coalesced - len(table))
+
+def optimize_tables(tt_tables, resolver=None) -> tuple[dict[str, np.ndarray], dict[str, OptimizationReport]]:
+    '''
+    Optimize every board of a compile_intent() result.
+    '''
+    tables = {}
+    reports = {}
+    for board_id, table in tt_tables.items():
+        tables[board_id], reports[board_id] = optimize_table(table, board_id, resolver)
+    return tables, reports
@@ -0,0 +1,372 @@
+'''
+Cycle accurate simulator for compiled timing tables.
+
+Execution model, in 0.1 ms clock ticks:
+    - Every line first waits its Ticks delay, counted from when the previous line finished (or from the sync pulse
+      that released the board), then executes.
+    - WRITE stores the value in the board's register at Address.
+    - WAIT marks the board READY and blocks it until the next SYNC pulse.
+    - LOOP jumps back to line Address; a loop with count N jumps back N times and then falls through.
+    - END stops the board. Running past the last line without an END also stops it, and is reported.
+    - The control board (0) generates the SYNC pulse once it is waiting and every other board that has not ended is
+      READY. Without a control board table the pulse fires as soon as every running board is READY.
+
+The tables are designed on a shared time base, so a board that sits at a WAIT for longer than the tolerance before
+the pulse arrives is reported as a sync violation.
+
+Loops are evaluated in closed form rather than iterated: once the whole system is back in the same state at a sync
+pulse (same lines, registers and active loops, only the loop counters lower), the remaining full periods are
+skipped by arithmetic. Loops without a WAIT are skipped on their first pass the same way.
+'''
+import json
+import argparse
+import itertools
+from dataclasses import dataclass, field
+from tt_engine.tt_dataclass import opcodeCommand, OPCODE_VALUES
+from tt_engine.tt_compiler import compile_tables, unresolved_message
+
+WRITE = OPCODE_VALUES[opcodeCommand.WRITE]
+WAIT = OPCODE_VALUES[opcodeCommand.WAIT]
+LOOP = OPCODE_VALUES[opcodeCommand.LOOP]
+END = OPCODE_VALUES[opcodeCommand.END]
+
+@dataclass
+class PeriodicBlock:
+    '''
+    The writes in points (tick offsets from start_tick) repeated repeats times, period_ticks apart.
+    position is the number of explicit timeline points written before the block.
+    '''
+    start_tick: int
+    period_ticks: int
+    repeats: int
+    points: list[tuple[int, float]]
+    position: int = 0
+
+@dataclass
+class RegisterTimeline:
+    '''
+    Value history of one register: explicit writes plus runs of writes repeated in closed form.
+    '''
+    board_id: str
+    address: int
+    points: list[tuple[int, float]] = field(default_factory=list)
+    periodic: list[PeriodicBlock] = field(default_factory=list)
+
+    @property
+    def write_count(self):
+        return len(self.points) + sum(block.repeats * len(block.points) for block in self.periodic)
+
+    @property
+    def final_value(self):
+        last_block = max(self.periodic, key=lambda block: block.position, default=None)
+        if last_block is not None and last_block.position == len(self.points):
+            return last_block.points[-1][1]
+        return self.points[-1][1] if self.points else None
+
+    def _iter_all(self):
+        blocks = sorted(self.periodic, key=lambda block: block.position)
+
+        for position in range(len(self.points) + 1):
+            while blocks and blocks[0].position == position:
+                block = blocks.pop(0)
+                for repeat in range(block.repeats):
+                    for offset, value in block.points:
+                        yield block.start_tick + repeat * block.period_ticks + offset, value
+            if position < len(self.points):
+                yield self.points[position]
+
+    def iter_points(self, limit=None):
+        '''
+        All writes in time order, expanding the periodic blocks, up to limit points.
+        '''
+        return itertools.islice(self._iter_all(), limit)
+
+@dataclass
+class SyncViolation:
+    board_id: str
+    line: int
+    kind: str #'stall', 'deadlock' or 'no_end'
+    first_tick: int
+    stall_ticks: int = 0
+    occurrences: int = 1
+
+@dataclass
+class SimulationResult:
+    end_ticks: dict[str, int]
+    pulses: int
+    timelines: dict[tuple[str, int], RegisterTimeline]
+    violations: list[SyncViolation]
+    skipped_periods: int = 0 #Sync periods evaluated in closed form, included in pulses
+    local_loop_jumps: int = 0 #Passes of WAIT free loops evaluated in closed form, not sync pulses
+
+    @property
+    def duration_ticks(self):
+        return max(self.end_ticks.values(), default=0)
+
+    def duration_ms(self):
+        return self.duration_ticks / 10.0
+
+class _Board:
+
+    def __init__(self, board_id, table):
+        self.board_id = board_id
+        self.opcodes = table['opcode'].tolist()
+        self.ticks = table['ticks'].tolist()
+        self.addresses = table['address'].tolist()
+        self.values = table['setpoint'].tolist()
+        self.pc = 0
+        self.tick = 0
+        self.waiting_since = None
+        self.ended = False
+        self.counters = {} #LOOP line -> remaining jumps
+        self.registers = {}
+
+    def signature(self):
+        return (self.pc, self.waiting_since is not None, self.ended,
+                tuple(sorted(self.counters)), tuple(sorted(self.registers.items())))
+
+class TimingTableSimulator:
+
+    def __init__(self, tt_tables, stall_tolerance_ticks=0, max_pulses=1_000_000):
+        self.tt_tables = tt_tables
+        self.stall_tolerance_ticks = stall_tolerance_ticks
+        self.max_pulses = max_pulses
+
+    def run(self) -> SimulationResult:
+        self.boards = {board_id: _Board(board_id, table) for board_id, table in self.tt_tables.items()}
+        self.timelines = {}
+        self.violations = {}
+        self.violation_log = []
+        self.skipped_periods = 0
+        self.local_loop_jumps = 0
+        pulses = 0
+        seen = {}
+
+        while True:
+            for board in self.boards.values():
+                self.advance(board)
+
+            pulse_tick = self.pulse_tick()
+
+            if pulse_tick is None:
+                break
+
+            pulses += 1
+            self.release(pulse_tick)
+
+            state = tuple(board.signature() for board in self.boards.values())
+            previous = seen.get(state)
+
+            if previous is not None:
+                self.skip_periods(previous, pulse_tick)
+                seen.clear()
+            elif pulses < self.max_pulses:
+                seen[state] = self.snapshot(pulse_tick)
+            else:
+                raise RuntimeError(f"No periodic state found after {self.max_pulses} sync pulses")
+
+        for board in self.boards.values():
+            if board.waiting_since is not None:
+                self.report(board, 'deadlock', board.waiting_since)
+
+        violations = sorted(self.violations.values(), key=lambda v: (v.first_tick, v.board_id, v.line))
+        return SimulationResult(end_ticks={board_id: board.tick for board_id, board in self.boards.items()},
+                                pulses=pulses + self.skipped_periods,
+                                timelines=self.timelines,
+                                violations=violations,
+                                skipped_periods=self.skipped_periods,
+                                local_loop_jumps=self.local_loop_jumps)
+
+    def advance(self, board):
+        '''
+        Execute lines until the board blocks at a WAIT or ends.
+        '''
+        while not board.ended and board.waiting_since is None:
+            if board.pc >= len(board.opcodes):
+                board.ended = True
+                self.report(board, 'no_end', board.tick)
+                return
+
+            line = board.pc
+            board.tick += board.ticks[line]
+            opcode = board.opcodes[line]
+
+            if opcode == WRITE:
+                self.write(board, board.addresses[line], board.values[line])
+                board.pc += 1
+            elif opcode == WAIT:
+                board.waiting_since = board.tick
+            elif opcode == LOOP:
+                self.loop(board, line)
+            elif opcode == END:
+                board.ended = True
+            else:
+                raise ValueError(f"Board {board.board_id} line {line}: unknown opcode {opcode:#x}")
+
+    def loop(self, board, line):
+        target = board.addresses[line]
+
+        if line not in board.counters:
+            board.counters[line] = int(board.values[line])
+            body = range(target, line)
+
+            if board.counters[line] > 0 and all(board.opcodes[i] == WRITE for i in body):
+                self.skip_local_loop(board, line, body) #Body has no WAIT, evaluate it in closed form
+                return
+
+        if board.counters[line] > 0:
+            board.counters[line] -= 1
+            board.pc = target
+        else:
+            del board.counters[line]
+            board.pc = line + 1
+
+    def skip_local_loop(self, board, line, body):
+        '''
+        Jump back counter times over a body of plain writes: every pass repeats the same writes with the same timing.
+        '''
+        jumps = board.counters.pop(line)
+        period = sum(board.ticks[i] for i in body) + board.ticks[line]
+        offsets = {}
+        offset = 0
+
+        for i in body:
+            offset += board.ticks[i]
+            offsets.setdefault(board.addresses[i], []).append((offset, board.values[i]))
+
+        for address, points in offsets.items():
+            timeline = self.timeline(board, address)
+            timeline.periodic.append(PeriodicBlock(board.tick, period, jumps, points, len(timeline.points)))
+
+        board.tick += jumps * period
+        board.pc = line + 1
+        self.local_loop_jumps += jumps
+
+    def write(self, board, address, value):
+        board.registers[address] = value
+        self.timeline(board, address).points.append((board.tick, value))
+
+    def timeline(self, board, address):
+        key = (board.board_id, address)
+        timeline = self.timelines.get(key)
+        if timeline is None:
+            timeline = self.timelines[key] = RegisterTimeline(board.board_id, address)
+        return timeline
+
+    def pulse_tick(self):
+        '''
+        Tick of the next SYNC pulse, None if no pulse can fire.
+        '''
+        running = [board for board in self.boards.values() if not board.ended]
+        control = self.boards.get("0")
+
+        if not running or any(board.waiting_since is None for board in running):
+            return None
+
+        if control is not None and control.ended:
+            return None #Nobody left to generate the pulse
+
+        return max(board.waiting_since for board in running)
+
+    def release(self, pulse_tick):
+        for board in self.boards.values():
+            if board.waiting_since is None:
+                continue
+
+            stall = pulse_tick - board.waiting_since
+            if stall > self.stall_tolerance_ticks:
+                self.report(board, 'stall', board.waiting_since, stall)
+
+            board.tick = pulse_tick
+            board.waiting_since = None
+            board.pc += 1
+
+    def report(self, board, kind, tick, stall_ticks=0):
+        key = (board.board_id, board.pc, kind, stall_ticks)
+        violation = self.violations.get(key)
+
+        if violation is None:
+            violation = self.violations[key] = SyncViolation(board.board_id, board.pc, kind, tick, stall_ticks, 0)
+
+        violation.occurrences += 1
+        self.violation_log.append(key)
+
+    def snapshot(self, pulse_tick):
+        return {
+            "tick": pulse_tick,
+            "counters": {board_id: dict(board.counters) for board_id, board in self.boards.items()},
+            "points": {key: len(timeline.points) for key, timeline in self.timelines.items()},
+            "violations": len(self.violation_log)
+        }
+
+    def skip_periods(self, previous, pulse_tick):
+        '''
+        The system is in the same state as at an earlier pulse: skip the full periods the loop counters still allow.
+        '''
+        period = pulse_tick - previous["tick"]
+        decrements = {}
+
+        for board_id, board in self.boards.items():
+            for line, count in board.counters.items():
+                decrement = previous["counters"][board_id][line] - count
+                if decrement > 0:
+                    decrements[(board_id, line)] = (count, decrement)
+
+        if not decrements or period <= 0:
+            return
+
+        periods = min(count // decrement for count, decrement in decrements.values()) - 1
+
+        if periods < 1:
+            return
+
+        for (board_id, line), (count, decrement) in decrements.items():
+            self.boards[board_id].counters[line] = count - periods * decrement
+
+        for key, timeline in self.timelines.items():
+            start = previous["points"].get(key, 0)
+            points = [(tick - previous["tick"], value) for tick, value in timeline.points[start:]]
+            if points:
+                timeline.periodic.append(PeriodicBlock(pulse_tick, period, periods, points, len(timeline.points)))
+
+        for key in self.violation_log[previous["violations"]:]:
+            self.violations[key].occurrences += periods
+
+        for board in self.boards.values():
+            if not board.ended:
+                board.tick += periods * period
+                if board.waiting_since is not None:
+                    board.waiting_since += periods * period
+
+        self.skipped_periods += periods
+
+def simulate(tt_tables, stall_tolerance_ticks=0) -> SimulationResult:
+    '''
+    Simulate compiled per-board tables (as returned by compile_intent) together.
+    '''
+    return TimingTableSimulator(tt_tables, stall_tolerance_ticks).run()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile an intent JSON and simulate its timing tables.")
+    parser.add_argument("intent", help="Intent JSON file")
+    parser.add_argument("--tolerance", type=int, default=0, help="Allowed stall at a WAIT before it is reported, in ticks")
+    args = parser.parse_args()
+
+    with open(args.intent, 'r') as f:
+        tt_tables, unresolved = compile_tables(json.load(f))
+
+    if unresolved:
+        print(unresolved_message(unresolved))
+
+    result = simulate(tt_tables, args.tolerance)
+    print(f"Duration: {result.duration_ms()} ms, {result.pulses} sync pulses ({result.skipped_periods} evaluated in closed form, "
+          f"{result.local_loop_jumps} loop passes without a WAIT skipped)")
+
+    for board_id, end_tick in result.end_ticks.items():
+        print(f"Board {board_id}: ends at {end_tick / 10.0} ms")
+
+    for violation in result.violations:
+        print(violation)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+'''
+Parameter sweep compiler.
+
+A sweep spec (JSON) names a base intent and the intent fields to vary:
+
+    {
+        "base_intent": "../gui/intents/default_HDC_intent.json",
+        "sweep": {
+            "sipPeriod": [100, 150, 200],
+            "fill": {"start": 10, "stop": 20, "step": 2.5}
+        },
+        "variants": {
+            "pathA_traveling_wave_profile": {"slow": {...profile...}, "fast": {...profile...}}
+        }
+    }
+
+Every combination of the sweep values and variants is compiled in a process pool. Identical results are
+deduplicated by a content hash of the encoded tables; each unique result is written once and index.json maps every
+sweep point to its result. Every board is written as its compiled array (board_<id>.npy) and as the CSV the GUI
+exports (board_<id>.csv), which is converted with convert_csv.exe exactly like the GUI does, unless conversion is
+turned off. A result with a board that failed to export or has lines without an FPGA address is marked
+"complete": false, both on the table and on every point that uses it, with the reason per board.
+'''
+import os
+import json
+import copy
+import hashlib
+import argparse
+import itertools
+import subprocess
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from tt_engine.tt_compiler import compile_tables
+from tt_engine.tt_image import CONVERT_CSV_EXE, export_table, write_tt_csv, duration_ticks
+
+def axis_values(values):
+    '''
+    Sweep axis values: a list, or a {"start", "stop", "step"} range with stop included.
+    '''
+    if isinstance(values, dict):
+        count = int(np.floor((values['stop'] - values['start']) / values['step'] + 1e-9)) + 1
+        return [round(values['start'] + i * values['step'], 10) for i in range(count)]
+    return list(values)
+
+def load_base_intent(spec, spec_dir='.'):
+    base_intent = spec['base_intent']
+    if isinstance(base_intent, dict):
+        return base_intent
+    with open(os.path.join(spec_dir, base_intent), 'r') as f:
+        return json.load(f)
+
+def expand_sweep(spec, base_intent):
+    '''
+    Yield (parameters, intent) for every point of the sweep. Variant parameters are reported by variant name.
+    '''
+    axes = [(key, [(value, value) for value in axis_values(values)]) for key, values in spec.get('sweep', {}).items()]
+    axes += [(key, [(name, variant) for name, variant in variants.items()]) for key, variants in spec.get('variants', {}).items()]
+
+    keys = [key for key, _ in axes]
+
+    for combination in itertools.product(*[values for _, values in axes]):
+        intent = copy.deepcopy(base_intent)
+        parameters = {}
+        for key, (label, value) in zip(keys, combination):
+            intent[key] = copy.deepcopy(value)
+            parameters[key] = label
+        yield parameters, intent
+
+def tables_hash(tt_tables):
+    digest = hashlib.sha256()
+    for board_id, table in tt_tables.items():
+        digest.update(board_id.encode())
+        digest.update(np.ascontiguousarray(table).tobytes())
+    return digest.hexdigest()
+
+def compile_point(intent):
+    '''
+    Worker process entry point: compile one intent, returning its content hash, tables and unresolved names per board,
+    or the error text.
+    '''
+    try:
+        tt_tables, unresolved = compile_tables(intent)
+    except Exception as e:
+        return None, None, None, f"{type(e).__name__}: {e}"
+
+    return tables_hash(tt_tables), tt_tables, unresolved, None
+
+def write_tables(tt_tables, table_dir, unresolved=None, exe_path=CONVERT_CSV_EXE, convert=True):
+    '''
+    Write every board's compiled array (board_<id>.npy) and table CSV (board_<id>.csv), converting the CSV with
+    convert_csv.exe unless convert is False. Returns the per board entries and the problems that make the result
+    incomplete, by board: a failed export or canonical names without an FPGA address.
+    '''
+    unresolved = unresolved or {}
+    os.makedirs(table_dir, exist_ok=True)
+    files = {}
+    problems = {}
+
+    for board_id, table in tt_tables.items():
+        csv_path = os.path.join(table_dir, f"board_{board_id}.csv")
+        np.save(os.path.join(table_dir, f"board_{board_id}.npy"), table)
+        files[board_id] = {"table": f"board_{board_id}.npy", "csv": f"board_{board_id}.csv", "lines": len(table),
+                           "duration_ticks": duration_ticks(table), "converted": False}
+
+        if unresolved.get(board_id):
+            files[board_id]["unresolved"] = unresolved[board_id]
+            problems[board_id] = f"no FPGA address found for {', '.join(unresolved[board_id])}"
+
+        try:
+            if convert:
+                export_table(table, board_id, csv_path, exe_path)
+                files[board_id]["converted"] = True
+            else:
+                write_tt_csv(table, csv_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            files[board_id]["export_error"] = str(e)
+            problems[board_id] = f"export failed: {e}"
+
+    return files, problems
+
+def run_sweep(spec, output_dir, max_workers=None, spec_dir='.', chunksize=16, exe_path=CONVERT_CSV_EXE, convert=True):
+    '''
+    Compile every point of a sweep spec across a process pool and write the unique tables plus index.json. The
+    unique tables are written (and converted) on a thread pool while the remaining points compile.
+    Returns the index dictionary.
+    '''
+    base_intent = load_base_intent(spec, spec_dir)
+    points = list(expand_sweep(spec, base_intent))
+    os.makedirs(output_dir, exist_ok=True)
+
+    index = {"points": [], "tables": {}, "converter": exe_path if convert else None}
+    writes = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, ThreadPoolExecutor(max_workers=max_workers) as writers:
+        results = executor.map(compile_point, [intent for _, intent in points], chunksize=chunksize)
+
+        for point, ((parameters, _), (digest, tt_tables, unresolved, error)) in enumerate(zip(points, results)):
+            if digest is not None and digest not in writes:
+                writes[digest] = writers.submit(write_tables, tt_tables, os.path.join(output_dir, digest[:16]),
+                                                unresolved, exe_path, convert)
+            index["points"].append({"point": point, "parameters": parameters, "hash": digest, "error": error})
+
+        for digest, write in writes.items():
+            files, problems = write.result()
+            index["tables"][digest] = {"folder": digest[:16], "complete": not problems, "boards": files,
+                                       "problems": problems}
+
+    for point in index["points"]:
+        point["complete"] = point["hash"] is not None and index["tables"][point["hash"]]["complete"]
+
+    with open(os.path.join(output_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=4)
+
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a timing table parameter sweep.")
+    parser.add_argument("spec", help="Sweep spec JSON file")
+    parser.add_argument("output_dir", help="Folder for the unique tables and index.json")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--exe", default=CONVERT_CSV_EXE, help="Path to convert_csv.exe")
+    parser.add_argument("--no-convert", action="store_true", help="Only write the table CSVs, do not run convert_csv.exe")
+    args = parser.parse_args()
+
+    with open(args.spec, 'r') as f:
+        spec = json.load(f)
+
+    index = run_sweep(spec, args.output_dir, max_workers=args.workers, spec_dir=os.path.dirname(os.path.abspath(args.spec)),
+                      exe_path=args.exe, convert=not args.no_convert)
+    failed = sum(1 for point in index["points"] if point["error"])
+    print(f"Compiled {len(index['points'])} points into {len(index['tables'])} unique tables ({failed} failed).")
+
+    for table in index["tables"].values():
+        if not table["complete"]:
+            print(f"INCOMPLETE {table['folder']}: " +
+                  "; ".join(f"board {board_id}: {problem}" for board_id, problem in table["problems"].items()))
+
+if __name__ == "__main__":
+    main()
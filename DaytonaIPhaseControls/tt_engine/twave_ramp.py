@@ -0,0 +1,166 @@
+import numpy as np
+from dataclasses import dataclass
+
+TWAVE_CLOCK_HZ = 10**8 #Ramp period counter clock
+TWAVE_PERIOD_DIVIDER = 32
+AMPLITUDE_FULL_SCALE = 4095 #12 bit amplitude DAC, amplitude is given in percent
+TICKS_PER_MS = 10
+WORD_MAX = 0xFFFF
+MAX_SEGMENT_MS = WORD_MAX // TICKS_PER_MS #Longest segment whose duration still fits the 16 bit tick field
+
+@dataclass
+class RampSegments:
+    '''
+    Encoded T-wave ramp, one entry per segment between consecutive profile points.
+
+    The ramp end registers take a 32 bit word: 16 bit period (or amplitude) in the high half and the 16 bit
+    segment duration in clock ticks in the low half. The timing table carries that word as a float, so the
+    *_values arrays hold the word reinterpreted as a big endian float32.
+    '''
+    start_time_ms: np.ndarray
+    start_frequency: np.ndarray
+    start_amplitude: np.ndarray
+    ticks: np.ndarray
+    frequency_words: np.ndarray
+    amplitude_words: np.ndarray
+    frequency_values: np.ndarray
+    amplitude_values: np.ndarray
+
+    def __len__(self):
+        return len(self.ticks)
+
+def _check_word(name, values, times_ms):
+    bad = np.flatnonzero((values < 0) | (values > WORD_MAX))
+    if len(bad):
+        raise ValueError(f"T-wave ramp {name} out of 16 bit range for the segment ending at {times_ms[bad[0] + 1]} ms: {values[bad[0]]}")
+
+def encode_ramp(times_ms, frequencies, amplitudes) -> RampSegments:
+    '''
+    Encode a ramp profile (breakpoint times, frequencies and amplitudes, first point = initial state) in one pass.
+    '''
+    times_ms = np.asarray(times_ms, dtype=np.float64)
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    amplitudes = np.asarray(amplitudes, dtype=np.float64)
+
+    ticks = np.trunc(np.diff(times_ms)).astype(np.int64) * TICKS_PER_MS
+    periods = np.trunc(TWAVE_CLOCK_HZ / (TWAVE_PERIOD_DIVIDER * frequencies[1:])).astype(np.int64)
+    amplitude_counts = np.trunc(amplitudes[1:] / 100 * AMPLITUDE_FULL_SCALE).astype(np.int64)
+
+    _check_word("duration ticks", ticks, times_ms)
+    _check_word("period", periods, times_ms)
+    _check_word("amplitude", amplitude_counts, times_ms)
+
+    frequency_words = ((periods << 16) | ticks).astype(np.uint32)
+    amplitude_words = ((amplitude_counts << 16) | ticks).astype(np.uint32)
+
+    return RampSegments(
+        start_time_ms=times_ms[:-1],
+        start_frequency=frequencies[:-1],
+        start_amplitude=amplitudes[:-1],
+        ticks=ticks,
+        frequency_words=frequency_words,
+        amplitude_words=amplitude_words,
+        frequency_values=frequency_words.astype('>u4').view('>f4').astype(np.float64),
+        amplitude_values=amplitude_words.astype('>u4').view('>f4').astype(np.float64)
+    )
+
+def fit_ramp(times_ms, frequencies, amplitudes, frequency_tolerance, amplitude_tolerance, max_segment_ms=MAX_SEGMENT_MS):
+    '''
+    Approximate a densely sampled frequency/amplitude curve with as few linear segments as possible.
+
+    Every segment stays within the tolerances of all samples it spans. Segments are grown greedily: from each
+    breakpoint the range of slopes that keeps every following sample within tolerance is narrowed sample by sample
+    (running max of the lower bounds, running min of the upper bounds) and the segment ends at the last sample where
+    both the frequency and the amplitude ranges are still open. Breakpoints fall on sample times, so sample the
+    curve on a whole millisecond grid.
+
+    Returns the breakpoint times, frequencies and amplitudes, the first point being the initial state.
+    '''
+    t = np.asarray(times_ms, dtype=np.float64)
+    channels = [(np.asarray(frequencies, dtype=np.float64), frequency_tolerance),
+                (np.asarray(amplitudes, dtype=np.float64), amplitude_tolerance)]
+
+    start = 0
+    start_values = [values[0] for values, _ in channels]
+    breakpoints = [(t[0], *start_values)]
+
+    while start < len(t) - 1:
+        window = slice(start + 1, max(start + 2, np.searchsorted(t, t[start] + max_segment_ms, side='right')))
+        dt = t[window] - t[start]
+        open_slopes = np.ones(len(dt), dtype=bool)
+        slope_ranges = []
+
+        for (values, tolerance), value_0 in zip(channels, start_values):
+            lower = np.maximum.accumulate((values[window] - tolerance - value_0) / dt)
+            upper = np.minimum.accumulate((values[window] + tolerance - value_0) / dt)
+            open_slopes &= lower <= upper
+            slope_ranges.append((lower, upper))
+
+        length = len(dt) if open_slopes.all() else max(1, int(np.argmin(open_slopes)))
+        end = start + length
+        start_values = [value_0 + (lower[length - 1] + upper[length - 1]) / 2 * dt[length - 1]
+                        for value_0, (lower, upper) in zip(start_values, slope_ranges)]
+        breakpoints.append((t[end], *start_values))
+        start = end
+
+    times, fitted_frequencies, fitted_amplitudes = (np.array(column) for column in zip(*breakpoints))
+    return times, fitted_frequencies, fitted_amplitudes
+
+def sample_curve(curve):
+    '''
+    Sample an intent curve description on its time grid, starting at 0 (the ramp start) every resolution_ms.
+    resolution_ms (default 1) must be a whole number of milliseconds, the step encode_ramp() times segments in.
+
+    Supported types:
+        "samples":     "time", "frequency" and "amplitude" lists, linearly resampled onto the grid. The times are
+                       taken relative to the first one, which is the ramp start.
+        "exponential": "duration" plus "frequency"/"amplitude" objects with "start", "end" and "tau" (ms),
+                       value(t) = end + (start - end) * exp(-t / tau)
+    '''
+    resolution = curve.get('resolution_ms', 1)
+
+    if resolution <= 0 or resolution != int(resolution):
+        raise ValueError(f"T-wave curve resolution_ms must be a positive whole number of milliseconds: {resolution}")
+
+    if curve['type'] == 'samples':
+        sample_times = np.asarray(curve['time'], dtype=np.float64)
+        sample_times = sample_times - sample_times[0]
+        times = np.arange(0.0, sample_times[-1] + resolution / 2, resolution)
+        return (times,
+                np.interp(times, sample_times, np.asarray(curve['frequency'], dtype=np.float64)),
+                np.interp(times, sample_times, np.asarray(curve['amplitude'], dtype=np.float64)))
+
+    if curve['type'] == 'exponential':
+        times = np.arange(0.0, curve['duration'] + resolution / 2, resolution)
+        values = []
+        for key in ('frequency', 'amplitude'):
+            spec = curve[key]
+            values.append(spec['end'] + (spec['start'] - spec['end']) * np.exp(-times / spec['tau']))
+        return times, values[0], values[1]
+
+    raise ValueError(f"Unsupported T-wave curve type: {curve['type']}")
+
+def expand_profile(profile):
+    '''
+    Traveling wave profile with its "curve" (if any) replaced by fitted "initial_state"/"ramps" breakpoints.
+    The curve's "tolerance" object gives the allowed "frequency" (Hz) and "amplitude" (%) error and is required: with
+    no error allowed every sample would become its own segment.
+    '''
+    curve = profile.get('curve')
+
+    if not curve:
+        return profile
+
+    tolerance = curve.get('tolerance') or {}
+    missing = [key for key in ('frequency', 'amplitude') if key not in tolerance]
+    if missing:
+        raise ValueError(f"T-wave curve needs a \"tolerance\" for {' and '.join(missing)}")
+
+    times, frequencies, amplitudes = fit_ramp(*sample_curve(curve),
+                                              frequency_tolerance=tolerance['frequency'],
+                                              amplitude_tolerance=tolerance['amplitude'])
+    return {
+        "initial_state": {"frequency": float(frequencies[0]), "amplitude": float(amplitudes[0])},
+        "ramps": [{"time": float(time), "state": {"frequency": float(frequency), "amplitude": float(amplitude)}}
+                  for time, frequency, amplitude in zip(times[1:], frequencies[1:], amplitudes[1:])]
+    }
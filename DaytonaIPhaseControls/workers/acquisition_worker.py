@@ -0,0 +1,91 @@
+import time
+import threading
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+MIN_INTERVAL_S = 0.01
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+class SampleQueue:
+    '''
+    Thread safe hand-off of timestamped samples from the acquisition thread to the GUI thread.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timestamps = []
+        self.samples = []
+
+    def append(self, timestamp, values):
+        with self.lock:
+            self.timestamps.append(timestamp)
+            self.samples.append(values)
+
+    def drain(self):
+        '''
+        Samples appended since the last drain, as (timestamps, values[sample, channel]) arrays.
+        '''
+        with self.lock:
+            timestamps, samples = self.timestamps, self.samples
+            self.timestamps, self.samples = [], []
+
+        if not samples:
+            return np.empty(0), np.empty((0, 0))
+        return np.array(timestamps), np.vstack(samples)
+
+class AcquisitionWorker(QThread):
+    '''
+    Polls a fixed list of channels at a fixed rate on its own thread.
+
+    Each read is timestamped with time.monotonic() at the midpoint of the request and pushed to the queue as one row
+    of values in channel order (NaN for channels that failed and for rows without a channel, which are not read), and
+    to the recorder if one is given. A read that fails as a whole is reported through error. Reads are
+    scheduled on a fixed grid; when a read overruns its slot the missed slots are skipped rather than bunched up.
+    '''
+
+    error = pyqtSignal(object)
+
+    def __init__(self, read_channels, channels, interval_s, queue=None, recorder=None):
+        super().__init__()
+        self.read_channels = read_channels
+        self.channels = list(channels)
+        self.read_names = [channel for channel in self.channels if channel] #Blank table rows have no channel
+        self.interval_s = max(float(interval_s), MIN_INTERVAL_S)
+        self.queue = queue if queue is not None else SampleQueue()
+        self.recorder = recorder
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        next_read = time.monotonic()
+
+        while not self.stop_event.is_set():
+            request_start = time.monotonic()
+            try:
+                result = self.read_channels(self.read_names) if self.read_names else None
+            except Exception as e:
+                result = e
+            timestamp = (request_start + time.monotonic()) / 2
+
+            if isinstance(result, Exception):
+                self.error.emit(result)
+            else:
+                readbacks = result.values if result is not None else {}
+                values = np.array([to_float(readbacks.get(channel)) for channel in self.channels])
+                self.queue.append(timestamp, values)
+                if self.recorder is not None:
+                    self.recorder.append(timestamp, values)
+
+            next_read += self.interval_s
+            now = time.monotonic()
+            if next_read < now: #Overran the slot, skip to the next one on the grid
+                next_read += np.ceil((now - next_read) / self.interval_s) * self.interval_s
+
+            self.stop_event.wait(next_read - now)
@@ -0,0 +1,149 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from PyQt5.QtCore import QObject, pyqtSignal
+
+def freeze(value):
+    '''
+    Hashable stand-in for a request argument (lists and dicts become tuples).
+    '''
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def request_key(func, args, kwargs):
+    '''
+    Identity of a request for coalescing, None if the arguments can not be hashed.
+    '''
+    key = (func, freeze(args), freeze(kwargs))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+class RequestHandle:
+    '''
+    One request on the pool. callbacks holds (channel, callback) for every caller coalesced onto it.
+    '''
+
+    def __init__(self, key):
+        self.key = key
+        self.future = None
+        self.wait_for = None #Future of the channel's previous request, run only after it is done
+        self.callbacks = []
+
+    def cancelled(self):
+        return self.future is not None and self.future.cancelled()
+
+class RequestExecutor(QObject):
+    '''
+    Shared, bounded thread pool for blocking ICS calls, replacing a QThread per call.
+
+    Results are delivered to the callbacks on the thread that owns the executor (the GUI thread). A request submitted
+    while an identical one is still in flight is coalesced onto it instead of being sent again. Requests on the same
+    channel (e.g. one table's readbacks) supersede each other: an older request that has not started is cancelled (or,
+    if it is already waiting on its predecessor, skipped without calling the ICS), one that is already running has its
+    result dropped, and the newer request only starts once the older one is done, so a channel's requests reach the
+    ICS and the tables in order.
+    '''
+
+    completed = pyqtSignal(object, object) #(RequestHandle, result), emitted from the pool threads
+
+    def __init__(self, max_workers=4, parent=None):
+        super().__init__(parent)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ics-request')
+        self.lock = threading.Lock()
+        self.in_flight = {} #key -> RequestHandle
+        self.latest = {} #channel -> RequestHandle
+        self.completed.connect(self.deliver) #Queued across threads, runs on the owner's thread
+
+    def submit(self, func, *args, callback=None, channel=None, **kwargs):
+        '''
+        Run func(*args, **kwargs) on the pool and pass the result (or the exception) to callback on the owner's thread.
+        '''
+        key = request_key(func, args, kwargs)
+
+        with self.lock:
+            handle = self.in_flight.get(key) if key is not None else None
+
+            if handle is None or handle.cancelled():
+                previous = self.latest.get(channel) if channel is not None else None
+                handle = RequestHandle(key)
+                if previous is not None:
+                    if not self.drop_channel(previous, channel):
+                        handle.wait_for = previous.future #Still running, keep the channel's requests in order
+                    elif previous.cancelled():
+                        handle.wait_for = previous.wait_for #Take over what the cancelled request was waiting on
+
+                if key is not None:
+                    self.in_flight[key] = handle
+                handle.future = self.pool.submit(self.run, handle, func, args, kwargs)
+            elif channel is not None:
+                if self.latest.get(channel) not in (None, handle):
+                    self.drop_channel(self.latest[channel], channel)
+                handle.callbacks = [(owner, callback) for owner, callback in handle.callbacks if owner != channel]
+
+            handle.callbacks.append((channel, callback))
+            if channel is not None:
+                self.latest[channel] = handle
+
+        return handle
+
+    def drop_channel(self, handle, channel):
+        '''
+        Detach a superseded request from channel, cancelling it if nobody else waits on it. True once it can no
+        longer run. Called with the lock held.
+        '''
+        handle.callbacks = [(owner, callback) for owner, callback in handle.callbacks if owner != channel]
+        if handle.callbacks or not handle.future.cancel():
+            return handle.future.done()
+
+        if self.in_flight.get(handle.key) is handle:
+            del self.in_flight[handle.key]
+        return True
+
+    def run(self, handle, func, args, kwargs):
+        if handle.wait_for is not None:
+            try:
+                handle.wait_for.result()
+            except (CancelledError, Exception):
+                pass
+
+        with self.lock:
+            if not handle.callbacks: #Superseded while it waited, do not send it
+                if self.in_flight.get(handle.key) is handle:
+                    del self.in_flight[handle.key]
+                return
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            result = e
+
+        self.completed.emit(handle, result)
+
+    def deliver(self, handle, result):
+        with self.lock:
+            if self.in_flight.get(handle.key) is handle:
+                del self.in_flight[handle.key]
+            for channel, _ in handle.callbacks:
+                if self.latest.get(channel) is handle:
+                    del self.latest[channel]
+            callbacks = handle.callbacks
+            handle.callbacks = []
+
+        for _, callback in callbacks:
+            if callback is not None:
+                callback(result)
+
+    def shutdown(self):
+        '''
+        Cancel queued requests and stop delivering results. Running requests finish in the background.
+        '''
+        with self.lock:
+            self.in_flight.clear()
+            self.latest.clear()
+        self.completed.disconnect(self.deliver)
+        self.pool.shutdown(wait=False, cancel_futures=True)